@@ -0,0 +1,161 @@
+"""
+Account data-access micro-benchmark
+Times registration as the views used to do it (SELECT the email, then a
+separate 17-column INSERT, each on a fresh cursor) against
+accounts.queries.insert_user (one INSERT ... ON CONFLICT(email) DO NOTHING),
+for new and already-registered emails, plus the profile read and update.
+Password hashing is left out so only the database work is measured.
+Statements run in autocommit mode, as they do in a request, against a
+temporary SQLite database with the users table's schema; the configured
+database is never written.
+
+Usage: python manage.py bench_account_queries [--iterations 2000]
+"""
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from accounts import queries
+
+
+PREFIX = 'bench-account-'
+
+
+def _user(number, email=None):
+    now = datetime.now().isoformat()
+    values = dict.fromkeys(queries.USER_COLUMNS, '')
+    values.update({
+        'id': f'{PREFIX}{number}',
+        'fullName': 'Bench User',
+        'name': 'Bench User',
+        'email': email or f'{PREFIX}{number}@example.com',
+        'role': 'CUSTOMER',
+        'status': 'ACTIVE',
+        'avatar': None,
+        'login_attempts': 0,
+        'createdAt': now,
+        'created_at': now,
+        'lastLogin': None,
+        'updated_at': now,
+    })
+    return values
+
+
+def legacy_register(values):
+    """The previous register(): existence check, then the insert"""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT id FROM users WHERE email = %s', [values['email']])
+        if cursor.fetchone():
+            return False
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            INSERT INTO users (
+                {', '.join(queries.USER_COLUMNS)}
+            ) VALUES ({', '.join(['%s'] * len(queries.USER_COLUMNS))})
+        """, [values[column] for column in queries.USER_COLUMNS])
+    return True
+
+
+def legacy_update_profile(user_id, email, updated_at):
+    """The previous update_profile(): email check, then the update"""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT id FROM users WHERE email = %s AND id != %s
+        """, [email, user_id])
+        if cursor.fetchone():
+            return 'conflict'
+        cursor.execute("""
+            UPDATE users
+            SET name = %s, fullName = %s, email = %s, avatar = %s,
+                phoneNumber = %s, phone = %s, address = %s,
+                updated_at = %s
+            WHERE id = %s
+        """, ['Bench User', 'Bench User', email, None, '', '', '', updated_at, user_id])
+        return 'updated' if cursor.rowcount else 'missing'
+
+
+def legacy_get_user(user_id):
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT id, fullName, name, email, phoneNumber, phone, address, avatar, role, status
+            FROM users WHERE id = %s
+        """, [user_id])
+        return cursor.fetchone()
+
+
+def _copy_users_schema(source, target):
+    """Create the users table and its indexes (no rows) in a new SQLite file"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE tbl_name = 'users' AND sql IS NOT NULL "
+            "ORDER BY type = 'index'"
+        )
+        statements = [row[0] for row in cursor.fetchall()]
+    if not statements:
+        raise CommandError(f'No users table in {source}')
+    db = sqlite3.connect(target)
+    try:
+        for statement in statements:
+            db.execute(statement)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _time(fn, count):
+    """Microseconds per call of fn(i) for i in range(count)"""
+    start = time.perf_counter()
+    for i in range(count):
+        fn(i)
+    return (time.perf_counter() - start) * 1e6 / count
+
+
+class Command(BaseCommand):
+    help = 'Compare the accounts data-access statements with the previous hand-written view SQL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000, help='Calls per measurement')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('This benchmark runs against a temporary SQLite database')
+        count = max(1, options['iterations'])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bench.sqlite3')
+            _copy_users_schema(connection.settings_dict['NAME'], path)
+            original = connection.settings_dict['NAME']
+            connection.close()
+            connection.settings_dict['NAME'] = path
+            try:
+                rows = self._measure(count)
+            finally:
+                connection.close()
+                connection.settings_dict['NAME'] = original
+
+        self.stdout.write(f'{count} calls each, {connection.vendor} (temporary database), autocommit')
+        self.stdout.write(f'{"operation":<24}{"previous us":>14}{"queries us":>14}{"speedup":>10}')
+        for name, before, after in rows:
+            self.stdout.write(f'{name:<24}{before:>14.1f}{after:>14.1f}{before / after:>9.2f}x')
+
+    def _measure(self, count):
+        """(operation, previous us, queries us) rows"""
+        now = datetime.now().isoformat()
+        rows = []
+        rows.append(('register (new email)',
+                     _time(lambda i: legacy_register(_user(i)), count),
+                     _time(lambda i: queries.insert_user(_user(count + i)), count)))
+        taken = _user(0)['email']
+        rows.append(('register (taken email)',
+                     _time(lambda i: legacy_register(_user(2 * count + i, taken)), count),
+                     _time(lambda i: queries.insert_user(_user(2 * count + i, taken)), count)))
+        rows.append(('get user',
+                     _time(lambda i: legacy_get_user(f'{PREFIX}{i}'), count),
+                     _time(lambda i: queries.get_profile(f'{PREFIX}{i}'), count)))
+        rows.append(('update profile',
+                     _time(lambda i: legacy_update_profile(f'{PREFIX}{i}', f'{PREFIX}{i}@example.com', now), count),
+                     _time(lambda i: queries.update_profile(
+                         f'{PREFIX}{i}', 'Bench User', f'{PREFIX}{i}@example.com', None, '', '', now), count)))
+        return rows
@@ -9,8 +9,8 @@ class Customer(models.Model):
     phone = models.CharField(max_length=20, blank=True, null=True)
     address = models.TextField(blank=True, null=True)
     bio = models.TextField(blank=True, null=True)
-    role = models.CharField(max_length=20, default='Customer')
-    status = models.CharField(max_length=20, default='active')
+    role = models.CharField(max_length=20, default='CUSTOMER')
+    status = models.CharField(max_length=20, default='ACTIVE')
     avatar = models.TextField(blank=True, null=True)
     password_hash = models.CharField(max_length=255, blank=True, null=True)
     login_attempts = models.IntegerField(default=0)
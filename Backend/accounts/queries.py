@@ -0,0 +1,69 @@
+"""
+Data access for the users table (customer accounts)
+Keeps the accounts SQL in one place. Every function is one statement, so
+it is one (autocommit) transaction: registration is an
+INSERT ... ON CONFLICT(email) DO NOTHING and profile updates rely on the
+unique email index rather than checking first, which removes the
+check-then-write race and the extra lookup of the old views.
+"""
+from django.db import IntegrityError, connection, transaction
+
+
+USER_COLUMNS = (
+    'id', 'fullName', 'name', 'email', 'phoneNumber', 'phone', 'address', 'bio',
+    'role', 'status', 'avatar', 'password_hash', 'login_attempts',
+    'createdAt', 'created_at', 'lastLogin', 'updated_at',
+)
+PROFILE_COLUMNS = ('id', 'fullName', 'name', 'email', 'phoneNumber', 'phone', 'address', 'avatar', 'role', 'status')
+
+INSERT_USER = (
+    f"INSERT INTO users ({', '.join(USER_COLUMNS)}) "
+    f"VALUES ({', '.join(['%s'] * len(USER_COLUMNS))}) "
+    "ON CONFLICT(email) DO NOTHING"
+)
+SELECT_PROFILE = f"SELECT {', '.join(PROFILE_COLUMNS)} FROM users WHERE id = %s"
+UPDATE_ADDRESS = 'UPDATE users SET address = %s, updated_at = %s WHERE id = %s'
+UPDATE_PROFILE = (
+    'UPDATE users SET name = %s, fullName = %s, email = %s, avatar = %s, '
+    'phoneNumber = %s, phone = %s, address = %s, updated_at = %s WHERE id = %s'
+)
+
+
+def insert_user(values):
+    """
+    Insert a user from a dict of USER_COLUMNS. Returns False (and inserts
+    nothing) if the email is already registered; a duplicate id still
+    raises IntegrityError.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(INSERT_USER, [values[column] for column in USER_COLUMNS])
+        return cursor.rowcount == 1
+
+
+def get_profile(user_id):
+    """PROFILE_COLUMNS of a user as a dict, or None"""
+    with connection.cursor() as cursor:
+        cursor.execute(SELECT_PROFILE, [user_id])
+        row = cursor.fetchone()
+    return dict(zip(PROFILE_COLUMNS, row)) if row else None
+
+
+def update_address(user_id, address, updated_at):
+    """Returns False if there is no such user"""
+    with connection.cursor() as cursor:
+        cursor.execute(UPDATE_ADDRESS, [address, updated_at, user_id])
+        return cursor.rowcount == 1
+
+
+def update_profile(user_id, name, email, avatar, contact_number, address, updated_at):
+    """'updated', 'missing' (no such user) or 'conflict' (email used by another account)"""
+    try:
+        # atomic() so a rejected update leaves an enclosing transaction usable
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(UPDATE_PROFILE, [
+                name, name, email, avatar, contact_number, contact_number, address, updated_at, user_id,
+            ])
+            return 'updated' if cursor.rowcount == 1 else 'missing'
+    except IntegrityError:
+        # Emails are stored canonical, so the unique index is the only constraint this can hit
+        return 'conflict'
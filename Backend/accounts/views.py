@@ -1,14 +1,16 @@
 import json
-import hashlib
 from datetime import datetime
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.db import connection
-from .models import Customer
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.views import TokenRefreshView
+from . import queries
+from admin_api import avatars, profiles
+from core import passwords, auth, tokens
 
-def hash_password(password):
-    """Simple password hashing using SHA256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+
+def _invalid_token():
+    return JsonResponse({'error': 'Invalid or expired token', 'code': 'token_not_valid'}, status=401)
 
 @csrf_exempt
 def register(request):
@@ -27,17 +29,20 @@ def register(request):
     if missing:
         return JsonResponse({'error': f'Missing required fields: {", ".join(missing)}'}, status=400)
 
-    # Check if email already exists
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT id FROM users WHERE email = %s", [data.get('email')])
-            if cursor.fetchone():
-                return JsonResponse({'error': 'Email already registered'}, status=409)
-    except Exception as e:
-        return JsonResponse({'error': f'Database error: {str(e)}'}, status=500)
+    # Emails are stored lower-case; the insert below detects taken ones
+    email = profiles.normalize_email(data['email'])
 
     # Hash password
-    password_hash = hash_password(data['password'])
+    try:
+        password_hash = passwords.hash_password(data['password'])
+    except passwords.HashingBusy as e:
+        return JsonResponse({'error': str(e)}, status=503, headers={'Retry-After': '1'})
+
+    # Keep avatar image data out of the users row
+    try:
+        avatar = avatars.store_avatar(data.get('avatar', ''))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
     
     # Prepare data with defaults
     current_time = datetime.now().isoformat()
@@ -46,14 +51,14 @@ def register(request):
         'id': data['id'],
         'fullName': data.get('fullName', ''),
         'name': data.get('name', ''),
-        'email': data.get('email', ''),
+        'email': email,
         'phoneNumber': data.get('phoneNumber', ''),
         'phone': data.get('phone', ''),
         'address': data.get('address', ''),
         'bio': data.get('bio', ''),
-        'role': 'Customer',  # Force Customer role
-        'status': data.get('status', 'active'),
-        'avatar': data.get('avatar', ''),
+        'role': 'CUSTOMER',  # Force Customer role (roles are stored upper-case)
+        'status': profiles.normalize_status(data.get('status')),  # Statuses are stored upper-case
+        'avatar': avatar,
         'password_hash': password_hash,
         'login_attempts': 0,
         'createdAt': current_time,
@@ -62,34 +67,12 @@ def register(request):
         'updated_at': current_time,
     }
 
-    # Insert into database
+    # One statement: ON CONFLICT(email) DO NOTHING reports a taken email
     try:
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                INSERT INTO users (
-                    id, fullName, name, email, phoneNumber, phone, address, bio,
-                    role, status, avatar, password_hash, login_attempts,
-                    createdAt, created_at, lastLogin, updated_at
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, [
-                user_data['id'],
-                user_data['fullName'],
-                user_data['name'],
-                user_data['email'],
-                user_data['phoneNumber'],
-                user_data['phone'],
-                user_data['address'],
-                user_data['bio'],
-                user_data['role'],
-                user_data['status'],
-                user_data['avatar'],
-                user_data['password_hash'],
-                user_data['login_attempts'],
-                user_data['createdAt'],
-                user_data['created_at'],
-                user_data['lastLogin'],
-                user_data['updated_at'],
-            ])
+        if not queries.insert_user(user_data):
+            return JsonResponse({'error': 'Email already registered'}, status=409)
+        auth.service.invalidate(email=user_data['email'])
+        profiles.invalidate(user_id=user_data['id'], email=user_data['email'])
             
         # Return success without sensitive data
         return JsonResponse({
@@ -110,8 +93,8 @@ def register(request):
 
 
 @csrf_exempt
-def login(request):
-    """Login user"""
+async def login(request):
+    """Login user (async so password verification waits on the hashing pool, not the event loop)"""
     if request.method != 'POST':
         return JsonResponse({'error': 'Method not allowed'}, status=405)
 
@@ -120,55 +103,68 @@ def login(request):
     except json.JSONDecodeError:
         return JsonResponse({'error': 'Invalid JSON format'}, status=400)
 
-    email = data.get('email', '').strip()
+    email = profiles.normalize_email(data.get('email'))
     password = data.get('password', '').strip()
 
     if not email or not password:
         return JsonResponse({'error': 'Email and password are required'}, status=400)
 
-    # Hash the provided password
-    password_hash = hash_password(password)
-
     try:
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT id, fullName, name, email, phoneNumber, role, status, avatar
-                FROM users 
-                WHERE email = %s AND password_hash = %s
-            """, [email, password_hash])
-            
-            row = cursor.fetchone()
-            
-            if not row:
-                return JsonResponse({'error': 'Invalid email or password'}, status=401)
-            
-            if row[6] != 'active':  # status column
-                return JsonResponse({'error': 'Account is not active'}, status=403)
-            
-            # Update last login
-            cursor.execute("""
-                UPDATE users 
-                SET lastLogin = %s, login_attempts = 0, updated_at = %s
-                WHERE id = %s
-            """, [datetime.now().isoformat(), datetime.now().isoformat(), row[0]])
-            
-            return JsonResponse({
-                'success': True,
-                'id': row[0],
-                'fullName': row[1],
-                'name': row[2],
-                'email': row[3],
-                'phoneNumber': row[4],
-                'role': row[5],
-                'avatar': row[7],
-            }, status=200)
+        # Lockouts, unknown emails and repeat logins are answered from memory
+        result = await auth.service.aauthenticate(email, password, auth.client_ip(request))
+        
+        if result.outcome == 'locked':
+            return JsonResponse({'error': 'Too many failed login attempts. Please try again later.'},
+                                status=429, headers={'Retry-After': str(result.retry_after)})
+        
+        if result.outcome == 'invalid':
+            return JsonResponse({'error': 'Invalid email or password'}, status=401)
+        
+        if result.outcome == 'inactive':
+            return JsonResponse({'error': 'Account is not active'}, status=403)
+        
+        # lastLogin is recorded by the auth service's write-behind buffer
+        user = result.principal
+        return JsonResponse({
+            'success': True,
+            'id': user['id'],
+            'fullName': user['fullName'],
+            'name': user['name'],
+            'email': user['email'],
+            'phoneNumber': user['phoneNumber'],
+            'role': user['role'],
+            'avatar': avatars.avatar_url(request, user['avatar']),
+            **tokens.issue_tokens(user),
+        }, status=200)
             
+    except passwords.HashingBusy as e:
+        return JsonResponse({'error': str(e)}, status=503, headers={'Retry-After': '1'})
     except Exception as e:
         return JsonResponse({
             'error': f'Login failed: {str(e)}'
         }, status=500)
 
 
+@csrf_exempt
+def logout(request):
+    """Revoke the caller's access token and the posted refresh token"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    try:
+        data = json.loads(request.body.decode('utf-8') or '{}')
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON format'}, status=400)
+
+    tokens.revoke_presented(request, data.get('refresh'))
+    return JsonResponse({'success': True}, status=200)
+
+
+class TokenRefresh(TokenRefreshView):
+    """Issue a new access token unless the refresh token has been revoked"""
+    serializer_class = tokens.RevocationAwareRefreshSerializer
+
+
 @csrf_exempt
 def update_address(request):
     """Update user's address"""
@@ -180,28 +176,28 @@ def update_address(request):
     except json.JSONDecodeError:
         return JsonResponse({'error': 'Invalid JSON format'}, status=400)
 
-    user_id = data.get('userId')
+    # A bearer token identifies the user; the posted userId is the legacy fallback
+    try:
+        caller = tokens.request_caller(request)
+    except AuthenticationFailed:
+        return _invalid_token()
+    user_id = caller.id if caller else data.get('userId')
     address = data.get('address', '')
 
     if not user_id:
         return JsonResponse({'error': 'User ID is required'}, status=400)
+    if not caller and tokens.token_required(user_id):
+        # Signed-in users must present their (unrevoked) token
+        return _invalid_token()
 
     try:
-        with connection.cursor() as cursor:
-            # Update address
-            cursor.execute("""
-                UPDATE users 
-                SET address = %s, updated_at = %s
-                WHERE id = %s
-            """, [address, datetime.now().isoformat(), user_id])
-            
-            if cursor.rowcount == 0:
-                return JsonResponse({'error': 'User not found'}, status=404)
-            
-            return JsonResponse({
-                'success': True,
-                'message': 'Address updated successfully'
-            }, status=200)
+        if not queries.update_address(user_id, address, datetime.now().isoformat()):
+            return JsonResponse({'error': 'User not found'}, status=404)
+        
+        return JsonResponse({
+            'success': True,
+            'message': 'Address updated successfully'
+        }, status=200)
             
     except Exception as e:
         return JsonResponse({
@@ -220,44 +216,43 @@ def update_profile(request):
     except json.JSONDecodeError:
         return JsonResponse({'error': 'Invalid JSON format'}, status=400)
 
-    user_id = data.get('userId')
+    # A bearer token identifies the user; the posted userId is the legacy fallback
+    try:
+        caller = tokens.request_caller(request)
+    except AuthenticationFailed:
+        return _invalid_token()
+    user_id = caller.id if caller else data.get('userId')
     if not user_id:
         return JsonResponse({'error': 'User ID is required'}, status=400)
+    if not caller and tokens.token_required(user_id):
+        # Signed-in users must present their (unrevoked) token
+        return _invalid_token()
 
     # Extract fields
     name = data.get('name', '')
-    email = data.get('email', '')
-    avatar = data.get('avatar', '')
+    email = profiles.normalize_email(data.get('email'))
+    try:
+        avatar = avatars.store_avatar(data.get('avatar', ''))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
     contact_number = data.get('contactNumber', '')
     address = data.get('address', '')
     current_time = datetime.now().isoformat()
 
     try:
-        with connection.cursor() as cursor:
-            # Check if email is already taken by another user
-            if email:
-                cursor.execute("""
-                    SELECT id FROM users WHERE email = %s AND id != %s
-                """, [email, user_id])
-                if cursor.fetchone():
-                    return JsonResponse({'error': 'Email already in use by another account'}, status=409)
-
-            # Update profile
-            cursor.execute("""
-                UPDATE users 
-                SET name = %s, fullName = %s, email = %s, avatar = %s, 
-                    phoneNumber = %s, phone = %s, address = %s, 
-                    updated_at = %s
-                WHERE id = %s
-            """, [name, name, email, avatar, contact_number, contact_number, address, current_time, user_id])
-            
-            if cursor.rowcount == 0:
-                return JsonResponse({'error': 'User not found'}, status=404)
-            
-            return JsonResponse({
-                'success': True,
-                'message': 'Profile updated successfully'
-            }, status=200)
+        # The unique email index rejects an address taken by another account
+        outcome = queries.update_profile(user_id, name, email, avatar, contact_number, address, current_time)
+        if outcome == 'conflict':
+            return JsonResponse({'error': 'Email already in use by another account'}, status=409)
+        if outcome == 'missing':
+            return JsonResponse({'error': 'User not found'}, status=404)
+        auth.service.invalidate(user_id=user_id, email=email)
+        profiles.invalidate(user_id=user_id, email=email)
+        
+        return JsonResponse({
+            'success': True,
+            'message': 'Profile updated successfully'
+        }, status=200)
             
     except Exception as e:
         return JsonResponse({
@@ -270,26 +265,19 @@ def get_user(request, user_id):
     if request.method != 'GET':
         return JsonResponse({'error': 'Method not allowed'}, status=405)
 
+    # With a token, only the user themself or an admin may read the record
+    try:
+        caller = tokens.request_caller(request)
+    except AuthenticationFailed:
+        return _invalid_token()
+    if caller and caller.id != user_id and str(caller.token.get('role', '')).upper() != 'ADMIN':
+        return JsonResponse({'error': 'Not allowed to view this user'}, status=403)
+
     try:
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT id, fullName, name, email, phoneNumber, phone, address, avatar, role, status
-                FROM users WHERE id = %s
-            """, [user_id])
-            row = cursor.fetchone()
-            if not row:
-                return JsonResponse({'error': 'User not found'}, status=404)
-            return JsonResponse({
-                'id': row[0],
-                'fullName': row[1],
-                'name': row[2],
-                'email': row[3],
-                'phoneNumber': row[4],
-                'phone': row[5],
-                'address': row[6],
-                'avatar': row[7],
-                'role': row[8],
-                'status': row[9],
-            }, status=200)
+        user = queries.get_profile(user_id)
+        if not user:
+            return JsonResponse({'error': 'User not found'}, status=404)
+        user['avatar'] = avatars.avatar_url(request, user['avatar'])
+        return JsonResponse(user, status=200)
     except Exception as e:
         return JsonResponse({'error': f'Failed to fetch user: {str(e)}'}, status=500)
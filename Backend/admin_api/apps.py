@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class AdminApiConfig(AppConfig):
+    name = 'admin_api'
+
+    def ready(self):
+        from core.db import apply_sqlite_pragmas
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid='core.db.apply_sqlite_pragmas')
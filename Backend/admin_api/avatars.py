@@ -0,0 +1,126 @@
+"""
+Content-addressed avatar store
+Decodes base64/data-URL avatars on write and stores them under
+MEDIA_ROOT/avatars/ named by their SHA-256, so identical images are kept
+once. The users row only holds the short media path; thumbnails are
+generated alongside the original.
+"""
+import base64
+import binascii
+import hashlib
+import io
+import re
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+
+AVATAR_DIR = 'avatars'
+MAX_AVATAR_BYTES = 5 * 1024 * 1024
+THUMBNAIL_SIZES = (64, 256)
+
+_DATA_URL_RE = re.compile(r'^data:(?P<mime>[\w/+.-]+)?(?:;[\w=-]+)*;base64,(?P<data>.*)$', re.DOTALL)
+_FORMAT_EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'gif', 'WEBP': 'webp', 'BMP': 'bmp'}
+
+
+def is_inline(value):
+    """True if the value is inline image data rather than a URL/path"""
+    if not value or not isinstance(value, str):
+        return False
+    if value.startswith('data:'):
+        return True
+    if '://' in value or value.startswith('/'):
+        return False
+    return len(value) > 256
+
+
+def _decode(value):
+    match = _DATA_URL_RE.match(value.strip())
+    payload = match.group('data') if match else value
+    try:
+        data = base64.b64decode(re.sub(r'\s+', '', payload), validate=True)
+    except (binascii.Error, ValueError):
+        raise ValueError('Avatar is not valid base64 image data')
+    if len(data) > MAX_AVATAR_BYTES:
+        raise ValueError(f'Avatar must be at most {MAX_AVATAR_BYTES // (1024 * 1024)} MB')
+    return data
+
+
+def _storage_name(digest, suffix):
+    return f'{AVATAR_DIR}/{digest[:2]}/{digest}{suffix}'
+
+
+def _save_once(name, data):
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(data))
+    return name
+
+
+def _thumbnail(image, size):
+    thumb = image.copy()
+    if thumb.mode not in ('RGB', 'RGBA'):
+        thumb = thumb.convert('RGBA')
+    thumb.thumbnail((size, size))
+    out = io.BytesIO()
+    thumb.save(out, format='WEBP', quality=80)
+    return out.getvalue()
+
+
+def store_avatar(value):
+    """
+    Store an inline avatar and return its media URL path.
+    Absolute URLs of stored avatars (as returned by reads) are reduced back
+    to their media path; other URLs and empty values are returned unchanged.
+    Raises ValueError if inline data is not a decodable image.
+    """
+    if not is_inline(value):
+        if value and '://' in value:
+            path = urlsplit(value).path
+            if path.startswith(f'{settings.MEDIA_URL}{AVATAR_DIR}/'):
+                return path
+        return value
+
+    data = _decode(value)
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except Exception:
+        raise ValueError('Avatar is not a supported image')
+    extension = _FORMAT_EXTENSIONS.get(image.format)
+    if not extension:
+        raise ValueError('Avatar is not a supported image')
+
+    digest = hashlib.sha256(data).hexdigest()
+    name = _save_once(_storage_name(digest, f'.{extension}'), data)
+    for size in THUMBNAIL_SIZES:
+        thumb_name = _storage_name(digest, f'_{size}.webp')
+        if not default_storage.exists(thumb_name):
+            default_storage.save(thumb_name, ContentFile(_thumbnail(image, size)))
+    return default_storage.url(name)
+
+
+def thumbnail_path(value, size=THUMBNAIL_SIZES[0]):
+    """Media path of a stored avatar's thumbnail (None for external/legacy avatars)"""
+    prefix = f'{settings.MEDIA_URL}{AVATAR_DIR}/'
+    if not value or not value.startswith(prefix):
+        return None
+    stem = value.rsplit('.', 1)[0]
+    return f'{stem}_{size}.webp'
+
+
+def media_base(request):
+    """Scheme and host to prefix media paths with, computed once per request"""
+    return request.build_absolute_uri('/').rstrip('/')
+
+
+def absolute(base, value):
+    """Make a stored media path absolute; other values pass through"""
+    if value and value.startswith(settings.MEDIA_URL):
+        return f'{base}{value}'
+    return value
+
+
+def avatar_url(request, value):
+    return absolute(media_base(request), value)
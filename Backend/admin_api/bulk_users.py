@@ -0,0 +1,277 @@
+"""
+Bulk user import/export
+Imports read a CSV or NDJSON request body as a stream and work in chunks:
+validate, reserve IDs per role prefix in one step, hash passwords on the
+hashing pool, and bulk_create inside one transaction per chunk (row by row
+when the chunk hits a conflict). Failures are reported per row and never
+abort other chunks. Exports stream the table
+from a chunked cursor as CSV or NDJSON, one batch in memory at a time.
+"""
+import codecs
+import csv
+import io
+import json
+from collections import defaultdict
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from rest_framework.utils.encoders import JSONEncoder
+from admin_api import avatars, ids, listing, profiles
+from admin_api.models import User
+from core import passwords
+
+
+CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+IMPORT_FIELDS = ('fullName', 'name', 'email', 'phoneNumber', 'phone', 'address', 'bio',
+                 'role', 'status', 'avatar', 'password')
+EXPORT_FIELDS = ('id', 'fullName', 'name', 'email', 'phoneNumber', 'phone', 'address', 'bio',
+                 'role', 'status', 'createdAt', 'lastLogin')
+VALID_ROLES = {role for role, _ in User.ROLE_CHOICES}
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def detect_format(content_type, requested=None):
+    """'csv' or 'ndjson' from an explicit ?type= or the Content-Type"""
+    if requested:
+        if requested not in FORMATS:
+            raise ValueError(f"Unsupported format {requested!r}; use {' or '.join(FORMATS)}")
+        return requested
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if content_type in ('text/csv', 'application/csv'):
+        return 'csv'
+    if content_type in ('application/x-ndjson', 'application/ndjson', 'application/jsonl'):
+        return 'ndjson'
+    raise ValueError('Send text/csv or application/x-ndjson (or pass ?type=csv|ndjson)')
+
+
+def read_rows(stream, fmt):
+    """
+    Yield (row_number, dict or None, parse_error) from a byte stream, one
+    line at a time. Row numbers count data rows from 1.
+    """
+    lines = codecs.iterdecode(stream, 'utf-8-sig')
+    if fmt == 'csv':
+        for number, row in enumerate(csv.DictReader(lines), start=1):
+            if None in row:
+                yield number, None, 'Row has more columns than the header'
+            else:
+                yield number, row, None
+        return
+
+    number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, None, f'Invalid JSON: {e}'
+            continue
+        if not isinstance(row, dict):
+            yield number, None, 'Each line must be a JSON object'
+            continue
+        yield number, row, None
+
+
+def clean_row(row):
+    """Return (values, errors) for one import row"""
+    errors = []
+    values = {}
+    for field in IMPORT_FIELDS:
+        value = row.get(field)
+        values[field] = '' if value is None else str(value).strip()
+
+    values['fullName'] = values['fullName'] or values['name']
+    values['name'] = values['name'] or values['fullName']
+    values['phoneNumber'] = values['phoneNumber'] or values['phone']
+    values['phone'] = values['phone'] or values['phoneNumber']
+    if not values['fullName']:
+        errors.append('fullName or name is required')
+
+    values['email'] = profiles.normalize_email(values['email'])
+    if not values['email']:
+        errors.append('email is required')
+    else:
+        try:
+            validate_email(values['email'])
+        except ValidationError:
+            errors.append(f"invalid email {values['email']!r}")
+
+    values['role'] = profiles.normalize_role(values['role'])
+    if values['role'] not in VALID_ROLES:
+        errors.append(f"unknown role {values['role']!r}")
+    values['status'] = profiles.normalize_status(values['status'])
+    return values, errors
+
+
+class ImportReport:
+    """Counts and per-row errors (``created`` counts would-be rows in a dry run)"""
+
+    def __init__(self, dry_run):
+        self.dry_run = dry_run
+        self.rows = 0
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def fail(self, number, messages):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': number, 'errors': messages})
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+            'dry_run': self.dry_run,
+        }
+
+
+def _import_chunk(chunk, seen_emails, report):
+    """Validate and insert one chunk of (row_number, row, parse_error)"""
+    valid = []
+    for number, row, parse_error in chunk:
+        report.rows += 1
+        if parse_error:
+            report.fail(number, [parse_error])
+            continue
+        values, errors = clean_row(row)
+        email_key = values['email']
+        if not errors and email_key in seen_emails:
+            errors.append(f"duplicate email {values['email']!r} in this import")
+        if errors:
+            report.fail(number, errors)
+            continue
+        seen_emails.add(email_key)
+        valid.append((number, values))
+
+    # Emails that already exist, in one query for the chunk
+    existing = set(
+        User.objects.filter(email__in=[values['email'] for _, values in valid]).values_list('email', flat=True)
+    )
+    accepted = []
+    for number, values in valid:
+        if values['email'] in existing:
+            report.fail(number, [f"email {values['email']!r} is already registered"])
+        else:
+            accepted.append((number, values))
+    if report.dry_run:
+        report.created += len(accepted)
+        return
+
+    # Avatars are written to storage only for rows that are about to be inserted
+    rows = []
+    for number, values in accepted:
+        try:
+            values['avatar'] = avatars.store_avatar(values['avatar'])
+        except ValueError as e:
+            report.fail(number, [str(e)])
+            continue
+        rows.append((number, values))
+    if not rows:
+        return
+
+    with_password = [(number, values['password']) for number, values in rows if values['password']]
+    hashes = dict(zip(
+        [number for number, _ in with_password],
+        passwords.hash_passwords([password for _, password in with_password]),
+    ))
+
+    by_prefix = defaultdict(list)
+    for number, values in rows:
+        by_prefix[ids.prefix_for_role(values['role'])].append((number, values))
+
+    users = []
+    for prefix, members in by_prefix.items():
+        # One sequence update per prefix per chunk
+        for user_id, (number, values) in zip(ids.next_ids(prefix, len(members)), members):
+            users.append((number, User(
+                id=user_id,
+                fullName=values['fullName'],
+                name=values['name'],
+                email=values['email'],
+                phoneNumber=values['phoneNumber'],
+                phone=values['phone'],
+                address=values['address'],
+                bio=values['bio'],
+                role=values['role'],
+                status=values['status'],
+                avatar=values['avatar'],
+                password_hash=hashes.get(number, ''),
+                login_attempts=0,
+            )))
+
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create([user for _, user in users], batch_size=CHUNK_SIZE)
+    except IntegrityError:
+        # e.g. an email registered concurrently; retry row by row to find the conflicts
+        _insert_one_by_one(users, report)
+        return
+    report.created += len(users)
+
+
+def _insert_one_by_one(users, report):
+    """Insert (row_number, User) pairs with a savepoint each, failing only conflicting rows"""
+    for number, user in users:
+        try:
+            with transaction.atomic():
+                user.save(force_insert=True)
+        except IntegrityError as e:
+            report.fail(number, [f'not inserted: {e}'])
+        else:
+            report.created += 1
+
+
+def import_users(stream, fmt, dry_run=False, chunk_size=CHUNK_SIZE):
+    """Import users from a CSV/NDJSON byte stream; returns the report dict"""
+    report = ImportReport(dry_run)
+    seen_emails = set()
+    for chunk in listing.batched(read_rows(stream, fmt), chunk_size):
+        _import_chunk(chunk, seen_emails, report)
+    return report.as_dict()
+
+
+class _Line:
+    """Write target for csv.writer that hands back what was written"""
+
+    def __init__(self):
+        self.buffer = io.StringIO()
+
+    def take(self):
+        value = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return value
+
+
+def export_users(fmt, queryset=None):
+    """Yield the users table as CSV or NDJSON text, one keyset batch at a time"""
+    queryset = (queryset if queryset is not None else User.objects.all()).order_by('id').values(*EXPORT_FIELDS)
+    rows = queryset.iterator(chunk_size=listing.BATCH_SIZE)
+
+    if fmt == 'csv':
+        out = _Line()
+        writer = csv.writer(out.buffer)
+        writer.writerow(EXPORT_FIELDS)
+        yield out.take()
+        for batch in listing.batched(rows):
+            listing.localize_batch(batch, ['createdAt', 'lastLogin'])
+            writer.writerows([[row[f] if row[f] is not None else '' for f in EXPORT_FIELDS] for row in batch])
+            yield out.take()
+        return
+
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for batch in listing.batched(rows):
+        listing.localize_batch(batch, ['createdAt', 'lastLogin'])
+        yield ''.join(encoder.encode(row) + '\n' for row in batch)
@@ -0,0 +1,60 @@
+"""
+Menu item -> category name map
+A versioned in-process cache so reports can resolve categories without a
+query per line item. Menu and category writes call invalidate(); the key
+also follows the shared 'menu' response cache version, so every process
+drops its copy together.
+"""
+import threading
+from django.db import transaction
+from admin_api import response_cache
+from admin_api.models import MenuItem, Category
+
+
+DEFAULT_CATEGORY = 'Other'
+
+_lock = threading.Lock()
+_version = 0
+_cached = None  # (version, mapping)
+
+
+def _bump():
+    global _version
+    with _lock:
+        _version += 1
+
+
+def invalidate():
+    """Discard the cached map once the current transaction commits"""
+    transaction.on_commit(_bump)
+
+
+def version():
+    return (_version, response_cache.version('menu'))
+
+
+def item_category_map():
+    """Return {menu item id: category name}, rebuilding at most once per version"""
+    global _cached
+    with _lock:
+        key = version()
+        if _cached is not None and _cached[0] == key:
+            return _cached[1]
+
+    category_names = dict(Category.objects.values_list('id', 'name'))
+    mapping = {
+        item_id: category_names.get(category, DEFAULT_CATEGORY)
+        for item_id, category in MenuItem.objects.values_list('id', 'category')
+    }
+
+    with _lock:
+        # Only publish if no write happened while we were building
+        if key == version():
+            _cached = (key, mapping)
+    return mapping
+
+
+def category_for(item_id, mapping=None):
+    """Category name of a menu item id ('Other' when unknown)"""
+    mapping = item_category_map() if mapping is None else mapping
+    return mapping.get(item_id, DEFAULT_CATEGORY)
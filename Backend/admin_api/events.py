@@ -0,0 +1,131 @@
+"""
+In-process event buses
+Order and menu writes publish events here; the SSE endpoints stream them
+to admin screens. A bounded ring buffer lets reconnecting clients replay what they
+missed via Last-Event-ID.
+"""
+import asyncio
+import json
+import threading
+from collections import deque
+from django.db import transaction
+from django.utils import timezone
+
+
+BUFFER_SIZE = 500          # events kept for Last-Event-ID replay
+SUBSCRIBER_QUEUE_SIZE = 200  # events buffered per slow client before it is dropped
+HEARTBEAT_SECONDS = 15
+
+
+class Subscriber:
+    """A single streaming client bound to the event loop serving it"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def deliver(self, event):
+        # Runs on the subscriber's loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class EventBus:
+    """Thread-safe publish/subscribe with a bounded replay buffer"""
+
+    def __init__(self, buffer_size=BUFFER_SIZE):
+        self._lock = threading.Lock()
+        self._buffer = deque(maxlen=buffer_size)
+        self._next_id = 1
+        self._subscribers = set()
+
+    def publish(self, event_type, data):
+        """Record an event and fan it out to every subscriber"""
+        with self._lock:
+            event = {'id': self._next_id, 'event': event_type, 'data': data}
+            self._next_id += 1
+            self._buffer.append(event)
+            subscribers = list(self._subscribers)
+
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub.deliver, event)
+            except RuntimeError:
+                # Loop already closed; the stream's cleanup will unsubscribe it
+                pass
+        return event
+
+    def subscribe(self, last_event_id=None):
+        """
+        Register a subscriber on the running loop.
+        Returns (subscriber, replay) where replay is the list of buffered events
+        after ``last_event_id``, or None if they are no longer all buffered.
+        """
+        sub = Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(sub)
+            replay = []
+            if last_event_id is not None:
+                oldest = self._buffer[0]['id'] if self._buffer else self._next_id
+                if last_event_id + 1 < oldest or last_event_id >= self._next_id:
+                    replay = None
+                else:
+                    replay = [e for e in self._buffer if e['id'] > last_event_id]
+        return sub, replay
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+
+order_events = EventBus()
+menu_events = EventBus()
+
+
+def format_sse(event):
+    """Encode an event dict as an SSE frame"""
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+def publish_order_event(event_type, order):
+    """Publish an order event once the surrounding transaction commits"""
+    data = {
+        'id': order.id,
+        'orderStatus': order.orderStatus,
+        'orderType': order.orderType,
+        'totalFee': float(order.totalFee or 0),
+        'updatedAt': (order.updated_at or timezone.now()).isoformat(),
+    }
+    transaction.on_commit(lambda: order_events.publish(event_type, data))
+
+
+def publish_menu_event(event_type, data):
+    """Publish a menu event once the surrounding transaction commits"""
+    transaction.on_commit(lambda: menu_events.publish(event_type, data))
+
+
+async def stream(bus, last_event_id=None):
+    """Async generator of SSE frames for one client"""
+    sub, replay = bus.subscribe(last_event_id)
+    try:
+        yield "retry: 3000\n\n"
+        if replay is None:
+            # Missed events fell out of the buffer; the client should refetch
+            yield "event: reset\ndata: {}\n\n"
+        else:
+            for event in replay:
+                yield format_sse(event)
+
+        while not sub.overflowed:
+            try:
+                event = await asyncio.wait_for(sub.queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event)
+        # Too slow to keep up: end the stream so the client reconnects and replays
+    finally:
+        bus.unsubscribe(sub)
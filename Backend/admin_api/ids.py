@@ -0,0 +1,125 @@
+"""
+ID allocation service
+Hands out prefixed IDs (order001, menu001, admin01, ...) from a sequence table
+with an atomic increment, instead of sorting existing IDs as strings on every
+insert. An optional in-process block allocator reserves IDs in chunks.
+"""
+import re
+import threading
+from django.conf import settings
+from django.db import transaction, IntegrityError
+from django.db.models import F
+from admin_api.models import User, MenuItem, Order, IdSequence
+
+
+# prefix -> (model whose IDs use it, zero-padding width)
+SEQUENCES = {
+    'order': (Order, 3),
+    'menu': (MenuItem, 3),
+    'admin': (User, 2),
+    'customer': (User, 2),
+    'staff': (User, 2),
+}
+
+ROLE_PREFIXES = {
+    'ADMIN': 'admin',
+    'CUSTOMER': 'customer',
+    'CHEF': 'staff',
+    'CASHIER': 'staff',
+    'WAITER': 'staff',
+    'SECURITY_GUARD': 'staff',
+    'STAFF': 'staff',
+}
+
+
+def prefix_for_role(role):
+    return ROLE_PREFIXES.get((role or '').upper(), 'customer')
+
+
+def format_id(prefix, number):
+    width = SEQUENCES.get(prefix, (None, 0))[1]
+    return f"{prefix}{number:0{width}d}"
+
+
+def _existing_max(prefix):
+    """Highest numeric suffix already used for a prefix (one-time seed scan)"""
+    model = SEQUENCES[prefix][0]
+    pattern = re.compile(rf'^{re.escape(prefix)}(\d+)$')
+    highest = 0
+    # Prefix match as a primary-key range so the lookup can use the PK index
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    candidates = model.objects.order_by().filter(pk__gte=prefix, pk__lt=upper)
+    for pk in candidates.values_list('pk', flat=True).iterator():
+        match = pattern.match(pk)
+        if match:
+            highest = max(highest, int(match.group(1)))
+    return highest
+
+
+def allocate(prefix, count=1):
+    """
+    Atomically reserve ``count`` numbers for a prefix.
+    Returns the first number of the reserved range.
+    """
+    for _ in range(2):
+        with transaction.atomic():
+            updated = IdSequence.objects.filter(prefix=prefix).update(last_value=F('last_value') + count)
+            if updated:
+                last = IdSequence.objects.values_list('last_value', flat=True).get(prefix=prefix)
+                return last - count + 1
+        # First use of this prefix: seed from the IDs already in the table
+        try:
+            with transaction.atomic():
+                IdSequence.objects.create(prefix=prefix, last_value=_existing_max(prefix))
+        except IntegrityError:
+            pass  # Another request seeded it first
+    raise RuntimeError(f'Could not allocate an ID for prefix {prefix!r}')
+
+
+class BlockAllocator:
+    """Reserves IDs from the sequence table in blocks and hands them out in-process"""
+
+    def __init__(self, block_size):
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._ranges = {}  # prefix -> [next, end)
+
+    def next_number(self, prefix):
+        with self._lock:
+            current, end = self._ranges.get(prefix, (0, 0))
+            if current >= end:
+                current = allocate(prefix, self.block_size)
+                end = current + self.block_size
+            self._ranges[prefix] = (current + 1, end)
+            return current
+
+
+_block_allocator = None
+_block_lock = threading.Lock()
+
+
+def _allocator():
+    """Block allocator when ID_BLOCK_SIZE > 1 in settings, otherwise None"""
+    global _block_allocator
+    block_size = getattr(settings, 'ID_BLOCK_SIZE', 1)
+    if block_size <= 1:
+        return None
+    with _block_lock:
+        if _block_allocator is None or _block_allocator.block_size != block_size:
+            _block_allocator = BlockAllocator(block_size)
+        return _block_allocator
+
+
+def next_id(prefix):
+    """Next formatted ID for a prefix, e.g. next_id('order') -> 'order101'"""
+    allocator = _allocator()
+    number = allocator.next_number(prefix) if allocator else allocate(prefix)
+    return format_id(prefix, number)
+
+
+def next_ids(prefix, count):
+    """Reserve ``count`` consecutive formatted IDs in one round trip"""
+    if count <= 0:
+        return []
+    first = allocate(prefix, count)
+    return [format_id(prefix, number) for number in range(first, first + count)]
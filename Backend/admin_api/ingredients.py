@@ -0,0 +1,134 @@
+"""
+Menu ingredients
+Submitted ingredient lists are parsed strictly (a list, a JSON array of
+strings, or comma/newline-separated text) and every name is interned in
+the ingredients vocabulary. menu_item_ingredients links items to ingredient
+IDs and is indexed by ingredient, so "which dishes contain X" (allergen
+filters, stock-outs) is an index lookup instead of a scan of every item's
+ingredients JSON. MenuItem.ingredients keeps the display list.
+"""
+import csv
+import io
+import json
+from django.db import transaction
+from admin_api.models import Ingredient, MenuItem, MenuItemIngredient
+
+
+MAX_INGREDIENTS = 100
+MAX_NAME_LENGTH = 100
+
+
+def ingredient_key(name):
+    """Vocabulary key of a name: case-folded, whitespace collapsed"""
+    return ' '.join(name.split()).casefold()
+
+
+def _clean(entries, strict=True):
+    names = []
+    seen = set()
+    for entry in entries:
+        if not isinstance(entry, str):
+            if strict:
+                raise ValueError('Each ingredient must be a string')
+            continue
+        name = ' '.join(entry.split())
+        if not name:
+            continue
+        if len(name) > MAX_NAME_LENGTH:
+            if strict:
+                raise ValueError(f'Ingredient names must be at most {MAX_NAME_LENGTH} characters')
+            continue
+        key = ingredient_key(name)
+        if key not in seen:
+            seen.add(key)
+            names.append(name)
+    if strict and len(names) > MAX_INGREDIENTS:
+        raise ValueError(f'At most {MAX_INGREDIENTS} ingredients per item')
+    return names
+
+
+def parse_ingredients(value):
+    """
+    Ingredient names from a submitted value, de-duplicated in order.
+    Raises ValueError for anything but a list of strings, a JSON array of
+    strings, or comma/newline-separated text.
+    """
+    if value is None:
+        return []
+    if isinstance(value, str):
+        text = value.strip()
+        if not text:
+            return []
+        if text[0] in '[{"':
+            try:
+                value = json.loads(text)
+            except ValueError as e:
+                raise ValueError(f'Ingredients are not valid JSON: {e}')
+        else:
+            value = [cell for row in csv.reader(io.StringIO(text)) for cell in row]
+    if not isinstance(value, (list, tuple)):
+        raise ValueError('Ingredients must be a list of names')
+    return _clean(value)
+
+
+def intern(names, ingredient_model=Ingredient):
+    """{key: ingredient id} for names, adding missing ones to the vocabulary"""
+    wanted = {}
+    for name in names:
+        wanted.setdefault(ingredient_key(name), name)
+    if not wanted:
+        return {}
+    ids = dict(ingredient_model.objects.filter(key__in=wanted).values_list('key', 'id'))
+    missing = [ingredient_model(key=key, name=name) for key, name in wanted.items() if key not in ids]
+    if missing:
+        ingredient_model.objects.bulk_create(missing, ignore_conflicts=True)
+        ids.update(ingredient_model.objects.filter(key__in=[i.key for i in missing]).values_list('key', 'id'))
+    return ids
+
+
+def _links(item_id, names, ids, link_model=MenuItemIngredient):
+    return [
+        link_model(menu_item_id=item_id, ingredient_id=ids[ingredient_key(name)], position=position)
+        for position, name in enumerate(names)
+    ]
+
+
+def sync_menu_item_ingredients(item):
+    """Replace an item's ingredient links with its (already parsed) ingredients list"""
+    names = _clean(item.ingredients or [], strict=False)
+    with transaction.atomic():
+        ids = intern(names)
+        MenuItemIngredient.objects.filter(menu_item_id=item.id).delete()
+        MenuItemIngredient.objects.bulk_create(_links(item.id, names, ids))
+
+
+def backfill_menu_ingredients(batch_size=500, menu_model=MenuItem, ingredient_model=Ingredient,
+                              link_model=MenuItemIngredient):
+    """
+    Rebuild every menu item's ingredient links from its ingredients JSON.
+    Returns (items, links) processed.
+    """
+    item_count = 0
+    link_count = 0
+    with transaction.atomic():
+        link_model.objects.all().delete()
+        items = menu_model.objects.order_by().values_list('id', 'ingredients').iterator(chunk_size=batch_size)
+        pending = []
+        for item_id, stored in items:
+            item_count += 1
+            names = _clean(stored if isinstance(stored, list) else [], strict=False)
+            pending.extend(_links(item_id, names, intern(names, ingredient_model), link_model))
+            if len(pending) >= batch_size:
+                link_model.objects.bulk_create(pending)
+                link_count += len(pending)
+                pending = []
+        if pending:
+            link_model.objects.bulk_create(pending)
+            link_count += len(pending)
+    return item_count, link_count
+
+
+def menu_item_ids_containing(names):
+    """Subquery of menu item IDs containing any of the named ingredients, for use in id__in"""
+    keys = {ingredient_key(name) for name in names if name and name.strip()}
+    return MenuItemIngredient.objects.filter(ingredient__key__in=keys).values('menu_item_id')
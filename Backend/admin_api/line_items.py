@@ -0,0 +1,129 @@
+"""
+Order line-item index
+Mirrors each order's orderList JSON into the order_line_items table so item
+reports can GROUP BY in SQL instead of walking every order in Python.
+"""
+from django.db import transaction
+from collections import defaultdict
+from django.db.models import Sum, Count, F
+from admin_api.models import Order, OrderLineItem
+from admin_api.rollups import normalize_day_key, to_decimal
+from admin_api import category_map
+
+
+def _to_int(value, default=1):
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return default
+
+
+def build_line_items(order, line_item_model=OrderLineItem):
+    """Build unsaved line-item rows from an order's orderList"""
+    if not isinstance(order.orderList, list):
+        return []
+
+    day_key = normalize_day_key(order.dayKey)
+    rows = []
+    for item in order.orderList:
+        if not isinstance(item, dict):
+            continue
+        quantity = _to_int(item.get('quantity', 1))
+        unit_price = to_decimal(item.get('price', 0))
+        line_total = to_decimal(item['total']) if item.get('total') not in (None, '') else unit_price * quantity
+        rows.append(line_item_model(
+            order_id=order.id,
+            menu_item_id=str(item.get('id') or ''),
+            name=item.get('name', 'Unknown'),
+            quantity=quantity,
+            unit_price=unit_price,
+            line_total=line_total,
+            dayKey=day_key,
+        ))
+    return rows
+
+
+def sync_order_line_items(order):
+    """Replace the mirrored line items of a single order"""
+    with transaction.atomic():
+        OrderLineItem.objects.filter(order_id=order.id).delete()
+        OrderLineItem.objects.bulk_create(build_line_items(order))
+
+
+def backfill_order_line_items(batch_size=500, order_model=Order, line_item_model=OrderLineItem):
+    """
+    Rebuild the line-item index from every order, streaming orders in batches.
+    Returns (orders, line_items) processed.
+    """
+    order_count = 0
+    item_count = 0
+    with transaction.atomic():
+        line_item_model.objects.all().delete()
+        pending = []
+        orders = order_model.objects.order_by().only('id', 'dayKey', 'orderList').iterator(chunk_size=batch_size)
+        for order in orders:
+            order_count += 1
+            pending.extend(build_line_items(order, line_item_model))
+            if len(pending) >= batch_size:
+                line_item_model.objects.bulk_create(pending)
+                item_count += len(pending)
+                pending = []
+        if pending:
+            line_item_model.objects.bulk_create(pending)
+            item_count += len(pending)
+    return order_count, item_count
+
+
+def _in_range(start_key=None, end_key=None):
+    items = OrderLineItem.objects.all()
+    if start_key:
+        items = items.filter(dayKey__gte=start_key)
+    if end_key:
+        items = items.filter(dayKey__lte=end_key)
+    return items.order_by()
+
+
+def popular_items(limit=10, start_key=None, end_key=None):
+    """
+    Top items by quantity sold, optionally within an inclusive YYYYMMDD day range.
+    Runs a single GROUP BY ... ORDER BY SUM(quantity) DESC LIMIT query.
+    """
+    grouped = (
+        _in_range(start_key, end_key)
+        .values('name')
+        .annotate(count=Sum('quantity'), revenue=Sum('line_total'))
+        .order_by('-count', 'name')[:limit]
+    )
+    return [{
+        'name': row['name'],
+        'count': row['count'],
+        'revenue': float(row['revenue'] or 0),
+    } for row in grouped]
+
+
+def category_sales(start_key=None, end_key=None):
+    """
+    Revenue (price x quantity) and line count per category.
+    Aggregates per menu item in SQL, then folds items into categories with
+    the cached item -> category map, so no per-line-item queries are made.
+    """
+    per_item = (
+        _in_range(start_key, end_key)
+        .values('menu_item_id')
+        .annotate(revenue=Sum(F('unit_price') * F('quantity')), lines=Count('id'))
+    )
+
+    mapping = category_map.item_category_map()
+    totals = defaultdict(float)
+    lines = defaultdict(int)
+    for row in per_item:
+        category = category_map.category_for(row['menu_item_id'], mapping)
+        totals[category] += float(row['revenue'] or 0)
+        lines[category] += row['lines']
+
+    return [{
+        'category': category,
+        'revenue': round(total, 2),
+        'orders': lines[category],
+        'growth': 0  # Placeholder for growth calculation
+    } for category, total in sorted(totals.items(), key=lambda x: x[1], reverse=True)]
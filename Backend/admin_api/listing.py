@@ -0,0 +1,80 @@
+"""
+Row helpers for values()-based listings
+Batching, in-place timezone conversion and JSON array streaming, so large
+listings never materialize model instances or the whole result set.
+
+Streamed bodies go through streaming_content(): the ASGI handler buffers a
+sync iterator completely before sending it (and the WSGI handler does the
+same with an async one), so the iterator type must match the server.
+"""
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+
+BATCH_SIZE = 500
+
+
+def batched(iterable, size=BATCH_SIZE):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def localize_batch(rows, fields):
+    """Replace aware datetimes in ``fields`` with local-time ISO strings, in place"""
+    tz = timezone.get_current_timezone()
+    for row in rows:
+        for field in fields:
+            value = row.get(field)
+            if not value:
+                row[field] = None
+                continue
+            if timezone.is_aware(value):
+                # Each value gets its own offset: a batch can span DST changes
+                value = timezone.localtime(value, tz)
+            row[field] = value.isoformat()
+    return rows
+
+
+def stream_json_array(batches, head='{"success":true,"data":[', tail=']}'):
+    """Yield a JSON document whose ``data`` array is produced batch by batch"""
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    yield head
+    first = True
+    for batch in batches:
+        if not batch:
+            continue
+        chunk = ','.join(encoder.encode(row) for row in batch)
+        yield chunk if first else ',' + chunk
+        first = False
+    yield tail
+
+
+_DONE = object()
+
+
+async def aiterate(iterable):
+    """
+    Async iterator over a sync iterable whose steps may query the database;
+    each step runs on the sync thread through sync_to_async.
+    """
+    iterator = iter(iterable)
+    step = sync_to_async(next)
+    while True:
+        item = await step(iterator, _DONE)
+        if item is _DONE:
+            return
+        yield item
+
+
+def streaming_content(request, iterable):
+    """``iterable`` in the form the serving handler streams without buffering"""
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        return aiterate(iterable)
+    return iterable
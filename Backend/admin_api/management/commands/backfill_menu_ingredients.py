@@ -0,0 +1,19 @@
+"""
+Rebuild the ingredients vocabulary links from every menu item's ingredients
+Usage: python manage.py backfill_menu_ingredients [--batch-size 500]
+"""
+from django.core.management.base import BaseCommand
+from admin_api import response_cache
+from admin_api.ingredients import backfill_menu_ingredients
+
+
+class Command(BaseCommand):
+    help = 'Intern every menu item ingredient and rebuild the menu_item_ingredients table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Menu items/links per batch')
+
+    def handle(self, *args, **options):
+        items, links = backfill_menu_ingredients(batch_size=options['batch_size'])
+        response_cache.invalidate('menu')
+        self.stdout.write(self.style.SUCCESS(f'Linked {links} ingredient(s) across {items} menu item(s)'))
@@ -0,0 +1,17 @@
+"""
+Rebuild the order_line_items index from every order's orderList
+Usage: python manage.py backfill_order_line_items [--batch-size 500]
+"""
+from django.core.management.base import BaseCommand
+from admin_api.line_items import backfill_order_line_items
+
+
+class Command(BaseCommand):
+    help = 'Mirror every order orderList into the order_line_items table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Orders/line items per batch')
+
+    def handle(self, *args, **options):
+        orders, items = backfill_order_line_items(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {items} line item(s) from {orders} order(s)'))
@@ -0,0 +1,60 @@
+"""
+Login throughput per hasher
+Times password verification for each configured hasher (PBKDF2, scrypt, and
+the legacy SHA-256 for reference) on one thread and on the hashing pool, and
+reports verifications per second overall and per core.
+
+Usage: python manage.py bench_password_hashing [--seconds 2] [--workers N]
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand
+
+
+PASSWORD = 'correct horse battery staple'
+
+
+def _rate(hasher, encoded, workers, seconds):
+    """Verifications per second with ``workers`` threads over roughly ``seconds``"""
+    deadline = time.perf_counter() + seconds
+
+    def run():
+        count = 0
+        while time.perf_counter() < deadline:
+            hasher.verify(PASSWORD, encoded)
+            count += 1
+        return count
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        total = sum(pool.map(lambda _: run(), range(workers)))
+    return total / (time.perf_counter() - start)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark login (password verification) throughput for each hasher setting'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=2.0, help='Duration of each measurement')
+        parser.add_argument('--workers', type=int, default=settings.PASSWORD_HASH_WORKERS,
+                            help='Threads for the parallel run (default PASSWORD_HASH_WORKERS)')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        cores = min(workers, os.cpu_count() or 1)
+        self.stdout.write(f'{os.cpu_count()} CPU(s), {workers} worker(s), {options["seconds"]}s per run')
+        self.stdout.write(f'{"hasher":<16}{"1 thread/s":>12}{"pool/s":>12}{"per core/s":>12}{"ms/login":>10}')
+
+        for index, hasher in enumerate(get_hashers()):
+            encoded = hasher.encode(PASSWORD, hasher.salt())
+            single = _rate(hasher, encoded, 1, options['seconds'])
+            parallel = _rate(hasher, encoded, workers, options['seconds'])
+            preferred = ' *' if index == 0 else ''
+            self.stdout.write(
+                f'{hasher.algorithm + preferred:<16}{single:>12.1f}{parallel:>12.1f}'
+                f'{parallel / cores:>12.1f}{1000 / single:>10.2f}'
+            )
+        self.stdout.write('* preferred hasher (PASSWORD_HASHER)')
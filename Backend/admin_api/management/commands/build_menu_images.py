@@ -0,0 +1,52 @@
+"""
+Backfill menu image derivatives
+Renders the WebP/JPEG widths and placeholder (see admin_api/menu_images.py)
+for menu items whose image has none yet, inline rather than on the pool.
+
+Usage: python manage.py build_menu_images [--force] [--dry-run]
+"""
+import os
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from admin_api import menu_images
+from admin_api.models import MenuItem
+
+
+class Command(BaseCommand):
+    help = 'Render resized derivatives and blur placeholders for menu item images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-render items that already have derivatives')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be rendered')
+
+    def handle(self, *args, **options):
+        items = MenuItem.objects.exclude(image='').exclude(image=None).order_by('id')
+        rendered = skipped = failed = 0
+        for item in items.iterator():
+            if menu_images.is_current(item) and not options['force']:
+                skipped += 1
+                continue
+            if options['dry_run']:
+                self.stdout.write(f'{item.id}: would render {item.image.name}')
+                rendered += 1
+                continue
+            try:
+                old = item.image_variants
+                if not menu_images.generate(item.id, item.image.name):
+                    skipped += 1
+                    continue
+                menu_images.delete_derivatives(old)  # the set being replaced, if any
+            except Exception as e:
+                self.stderr.write(f'{item.id}: {e}')
+                failed += 1
+                continue
+            original = default_storage.size(item.image.name)
+            item.refresh_from_db(fields=['image_variants'])
+            largest = max(item.image_variants['webp'], key=int)
+            webp = default_storage.size(item.image_variants['webp'][largest])
+            self.stdout.write(f'{item.id}: {os.path.basename(item.image.name)} {original // 1024} KB '
+                              f'-> {largest}px WebP {webp // 1024} KB')
+            rendered += 1
+
+        verb = 'Would render' if options['dry_run'] else 'Rendered'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {rendered} image(s); {skipped} skipped, {failed} failed'))
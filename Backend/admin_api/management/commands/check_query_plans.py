@@ -0,0 +1,131 @@
+"""
+Query plan harness
+Calls every admin_api endpoint, captures the SQL each one runs, and checks
+EXPLAIN QUERY PLAN for full table scans. Exits non-zero if an unexpected
+scan is found. All requests run inside a transaction that is rolled back,
+and login bookkeeping (normally written behind on another connection) is
+discarded, so the database is left unchanged.
+
+Usage: python manage.py check_query_plans [--verbose-plans]
+"""
+import json
+import re
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from admin_api.models import User, MenuItem, Order, Category
+from core import auth
+from core.write_behind import WriteBehindBuffer
+
+
+SCAN_RE = re.compile(r'^SCAN (\w+)(.*)$')
+
+
+def _cases():
+    """
+    (label, method, path, body, tables allowed to be scanned in full)
+    Whole-table aggregates and unfiltered list endpoints legitimately scan.
+    """
+    user = User.objects.order_by().values('id', 'email').first() or {'id': 'missing', 'email': 'missing@example.com'}
+    order_id = Order.objects.order_by().values_list('id', flat=True).first() or 'missing'
+    item_id = MenuItem.objects.order_by().values_list('id', flat=True).first() or 'missing'
+    category_id = Category.objects.order_by().values_list('id', flat=True).first() or 'missing'
+
+    return [
+        ('login', 'post', '/api/admin/auth/login', {'email': user['email'], 'password': 'x'}, set()),
+        ('dashboard stats (badge)', 'get', '/api/admin/dashboard/stats?fields=pending_orders', None, {'orders'}),
+        ('dashboard stats', 'get', '/api/admin/dashboard/stats', None, {'orders', 'users', 'menu_items'}),
+        ('dashboard charts', 'get', '/api/admin/dashboard/charts', None, set()),
+        ('users by role/status', 'get', '/api/admin/users?role=ADMIN&status=ACTIVE', None, set()),
+        ('users by status', 'get', '/api/admin/users?status=ACTIVE', None, set()),
+        ('user detail', 'get', f"/api/admin/users/{user['id']}", None, set()),
+        ('menu by category', 'get', '/api/admin/menu?category=cat001', None, set()),
+        ('menu by category/available', 'get', '/api/admin/menu?category=cat001&available=true', None, set()),
+        ('menu available', 'get', '/api/admin/menu?available=true', None, set()),
+        ('menu detail', 'get', f'/api/admin/menu/{item_id}', None, set()),
+        ('orders page', 'get', '/api/admin/orders?limit=20', None, set()),
+        ('orders by status', 'get', '/api/admin/orders?status=pending&limit=20', None, set()),
+        ('orders by type', 'get', '/api/admin/orders?order_type=delivery', None, set()),
+        ('orders since', 'get', '/api/admin/orders?since=2000-01-01T00:00:00', None, set()),
+        ('order detail', 'get', f'/api/admin/orders/{order_id}', None, set()),
+        ('order status update', 'put', f'/api/admin/orders/{order_id}/status', {'status': 'ready'}, set()),
+        ('order create', 'post', '/api/admin/orders', {'fullName': 'Plan Check', 'totalFee': 1,
+                                                      'orderList': [{'id': item_id, 'name': 'x', 'price': 1, 'quantity': 1}]}, set()),
+        ('categories', 'get', '/api/admin/categories', None, {'categories'}),
+        ('category detail', 'get', f'/api/admin/categories/{category_id}', None, set()),
+        ('sales report', 'get', '/api/admin/reports/sales', None, {'orders'}),
+        ('popular items', 'get', '/api/admin/reports/popular-items', None, set()),
+        ('popular items (range)', 'get', '/api/admin/reports/popular-items?start_date=2025-01-01&end_date=2025-12-31', None, set()),
+        ('revenue trend', 'get', '/api/admin/reports/revenue-trend', None, set()),
+        ('category sales', 'get', '/api/admin/reports/category-sales', None, {'categories', 'menu_items'}),
+        ('settings', 'get', '/api/admin/settings', None, {'settings'}),
+        ('profile by id', 'get', f"/api/admin/profile?userId={user['id']}", None, set()),
+    ]
+
+
+def full_scans(sql, params):
+    """Tables scanned without an index in the plan of one query"""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        plan = [row[-1] for row in cursor.fetchall()]
+    scans = []
+    for line in plan:
+        match = SCAN_RE.match(line)
+        if match and 'INDEX' not in match.group(2):
+            scans.append(match.group(1))
+    return scans, plan
+
+
+class Command(BaseCommand):
+    help = 'Fail if any admin_api endpoint query does an unexpected full table scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every query plan')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('EXPLAIN QUERY PLAN checks require SQLite')
+
+        client = Client()
+        failures = []
+        checked = 0
+
+        # The login probe queues lastLogin/login_attempts writes that would be
+        # committed outside the rolled-back transaction; send them nowhere
+        login_writes = auth.service.login_writes
+        auth.service.login_writes = WriteBehindBuffer('login-state-discarded', lambda entries: None)
+        try:
+            with transaction.atomic():
+                for label, method, path, body, allowed in _cases():
+                    with CaptureQueriesContext(connection) as captured:
+                        if body is None:
+                            getattr(client, method)(path)
+                        else:
+                            getattr(client, method)(path, data=json.dumps(body), content_type='application/json')
+
+                    for query in captured.captured_queries:
+                        sql = query['sql']
+                        if not sql.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+                            continue
+                        checked += 1
+                        # Captured SQL has parameters inlined already
+                        scans, plan = full_scans(sql, None)
+                        unexpected = [table for table in scans if table not in allowed]
+                        if options['verbose_plans']:
+                            self.stdout.write(f'[{label}] {sql}\n    ' + '\n    '.join(plan))
+                        if unexpected:
+                            failures.append((label, sql, plan, unexpected))
+                transaction.set_rollback(True)
+        finally:
+            auth.service.login_writes = login_writes
+
+        for label, sql, plan, tables in failures:
+            self.stdout.write(self.style.ERROR(f'[{label}] full scan of {", ".join(tables)}'))
+            self.stdout.write(f'    {sql}')
+            for line in plan:
+                self.stdout.write(f'      {line}')
+
+        if failures:
+            raise CommandError(f'{len(failures)} of {checked} queries do unexpected full table scans')
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} queries: no unexpected full table scans'))
@@ -0,0 +1,58 @@
+"""
+Rename menu images to content-hash names
+Copies each MenuItem.image stored under a plain upload name to its
+``<stem>.<sha256[:16]><ext>`` name (see core/media.py), points the item at
+it and re-renders its derivatives under the new name, so the image and its
+derivatives are served as immutable. Old files are kept for clients that
+still hold their URLs unless --delete-old is given.
+
+Usage: python manage.py hash_menu_images [--dry-run] [--delete-old]
+"""
+from django.core.management.base import BaseCommand
+from admin_api import menu_images, response_cache
+from admin_api.models import MenuItem
+from core import media
+
+
+class Command(BaseCommand):
+    help = 'Rewrite menu item image paths to content-hashed names'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be renamed')
+        parser.add_argument('--delete-old', action='store_true', help='Delete the old files and derivatives')
+
+    def handle(self, *args, **options):
+        storage = MenuItem._meta.get_field('image').storage
+        items = MenuItem.objects.exclude(image='').exclude(image=None).order_by('id')
+        renamed = skipped = failed = 0
+        for item in items.iterator():
+            old = item.image.name
+            if media.is_content_hashed(old):
+                skipped += 1
+                continue
+            try:
+                if not storage.exists(old):
+                    raise FileNotFoundError(f'{old} is missing')
+                with storage.open(old, 'rb') as f:
+                    new = storage.hashed_name(old, f) if options['dry_run'] else storage.save(old, f)
+                self.stdout.write(f'{item.id}: {old} -> {new}')
+                if options['dry_run']:
+                    renamed += 1
+                    continue
+
+                if not MenuItem.objects.filter(id=item.id, image=old).update(image=new):
+                    skipped += 1  # changed while we were copying
+                    continue
+                menu_images.generate(item.id, new)
+                if options['delete_old']:
+                    storage.delete(old)
+                    menu_images.delete_derivatives(item.image_variants)
+                renamed += 1
+            except Exception as e:
+                self.stderr.write(f'{item.id}: {e}')
+                failed += 1
+
+        if renamed and not options['dry_run']:
+            response_cache.invalidate('menu')
+        verb = 'Would rename' if options['dry_run'] else 'Renamed'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {renamed} image(s); {skipped} skipped, {failed} failed'))
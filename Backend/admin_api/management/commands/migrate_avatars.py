@@ -0,0 +1,54 @@
+"""
+Move inline base64 avatars out of the users table into the media store
+Usage: python manage.py migrate_avatars [--batch-size 200] [--dry-run]
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from admin_api import avatars
+from admin_api.models import User
+
+
+class Command(BaseCommand):
+    help = 'Convert inline base64 avatars into content-addressed media files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help='Users per batch')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be converted')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        converted = skipped = 0
+        last_id = ''
+
+        while True:
+            # Keyset over the primary key; only the id is loaded up front
+            ids = list(
+                User.objects.filter(id__gt=last_id)
+                .exclude(avatar__isnull=True).exclude(avatar='')
+                .exclude(avatar__startswith='http').exclude(avatar__startswith='/')
+                .order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+
+            updates = []
+            for user_id, value in User.objects.filter(id__in=ids).order_by('id').values_list('id', 'avatar').iterator():
+                if not avatars.is_inline(value):
+                    continue
+                try:
+                    path = value if options['dry_run'] else avatars.store_avatar(value)
+                except ValueError as e:
+                    skipped += 1
+                    self.stdout.write(self.style.WARNING(f'{user_id}: {e}'))
+                    continue
+                updates.append((user_id, path))
+
+            if updates and not options['dry_run']:
+                with transaction.atomic():
+                    for user_id, path in updates:
+                        User.objects.filter(id=user_id).update(avatar=path)
+            converted += len(updates)
+
+        verb = 'Would convert' if options['dry_run'] else 'Converted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {converted} avatar(s); skipped {skipped} undecodable'))
@@ -0,0 +1,14 @@
+"""
+Rebuild the daily_revenue rollup table from the orders table
+Usage: python manage.py rebuild_daily_rollups
+"""
+from django.core.management.base import BaseCommand
+from admin_api.rollups import rebuild_daily_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-day revenue/order rollup from all orders'
+
+    def handle(self, *args, **options):
+        days = rebuild_daily_rollups()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt daily rollup for {days} day(s)'))
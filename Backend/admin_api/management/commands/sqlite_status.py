@@ -0,0 +1,37 @@
+"""
+Report the SQLite PRAGMAs in effect against settings.SQLITE_PRAGMAS
+Usage: python manage.py sqlite_status [--database default]
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from core.db import pragma_report, pragma_matches
+
+
+class Command(BaseCommand):
+    help = 'Show configured vs. in-effect SQLite PRAGMAs and connection reuse settings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Database alias to inspect')
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        connection = connections[alias]
+        if connection.vendor != 'sqlite':
+            raise CommandError(f'Database {alias!r} is not SQLite')
+
+        self.stdout.write(f"Database: {connection.settings_dict['NAME']}")
+        self.stdout.write(f"CONN_MAX_AGE: {connection.settings_dict.get('CONN_MAX_AGE')}")
+        self.stdout.write(f"Busy timeout: {connection.settings_dict['OPTIONS'].get('timeout')}s")
+        mismatched = 0
+        for name, (configured, actual) in pragma_report(alias).items():
+            line = f'  {name:<14} configured={configured!s:<12} in effect={actual}'
+            if pragma_matches(configured, actual):
+                self.stdout.write(self.style.SUCCESS(line))
+            else:
+                mismatched += 1
+                self.stdout.write(self.style.WARNING(line))
+        if mismatched:
+            self.stdout.write(self.style.WARNING(
+                f'{mismatched} PRAGMA(s) not in effect: check SQLITE_PRAGMAS in settings '
+                'and that the database file is writable'
+            ))
@@ -0,0 +1,190 @@
+"""
+Menu image derivatives
+Uploaded menu images are kept as uploaded (under content-hash names, see
+core/media.py) and, on a background worker pool, rendered to WebP and JPEG
+at fixed widths (never upscaled) plus a tiny blurred WebP placeholder
+inlined as a data URL. The result is recorded in
+MenuItem.image_variants, tied to the image it was made from, so a payload
+only advertises derivatives of the current image. Animated images use
+their first frame.
+"""
+import base64
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePosixPath
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageFilter, ImageOps
+from admin_api import avatars, response_cache
+from admin_api.models import MenuItem
+
+
+logger = logging.getLogger(__name__)
+
+DERIVED_DIR = 'menu_items/derived'
+WIDTHS = (320, 640, 1024)
+PLACEHOLDER_WIDTH = 16
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=settings.MENU_IMAGE_WORKERS, thread_name_prefix='menu-image')
+    return _pool
+
+
+def _load(name):
+    with default_storage.open(name, 'rb') as f:
+        image = Image.open(io.BytesIO(f.read()))
+        image.seek(0)
+        image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+    return image.convert('RGBA' if has_alpha else 'RGB')
+
+
+def _encode(image, fmt):
+    pil_format, options = FORMATS[fmt]
+    if pil_format == 'JPEG' and image.mode == 'RGBA':
+        # JPEG has no alpha: flatten onto white
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    out = io.BytesIO()
+    image.save(out, format=pil_format, **options)
+    return out.getvalue()
+
+
+def _resize(image, width):
+    if width >= image.width:
+        return image
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+
+def _placeholder(image):
+    tiny = _resize(image, PLACEHOLDER_WIDTH).filter(ImageFilter.GaussianBlur(1))
+    out = io.BytesIO()
+    tiny.save(out, format='WEBP', quality=40)
+    return 'data:image/webp;base64,' + base64.b64encode(out.getvalue()).decode('ascii')
+
+
+def render(name):
+    """Write the derivatives of a stored image and return its image_variants dict"""
+    image = _load(name)
+    stem = PurePosixPath(name).stem
+    variants = {
+        'source': name,
+        'width': image.width,
+        'height': image.height,
+        'placeholder': _placeholder(image),
+    }
+    for width in sorted({min(width, image.width) for width in WIDTHS}):
+        resized = _resize(image, width)
+        for fmt in FORMATS:
+            path = default_storage.save(
+                f'{DERIVED_DIR}/{stem}/{width}.{"jpg" if fmt == "jpeg" else fmt}',
+                ContentFile(_encode(resized, fmt)),
+            )
+            variants.setdefault(fmt, {})[str(width)] = path
+    return variants
+
+
+def delete_derivatives(variants):
+    """Remove the files listed in an image_variants dict"""
+    for fmt in FORMATS:
+        for path in (variants or {}).get(fmt, {}).values():
+            default_storage.delete(path)
+
+
+def release(item):
+    """
+    Once the current transaction commits, delete an item's current
+    derivatives and image file, unless an item still stores the same
+    (content-hashed, so shared) file. Call inside the transaction, before
+    replacing or deleting the image; a rolled-back write keeps both.
+    """
+    name = item.image.name if item.image else ''
+    variants = item.image_variants
+    transaction.on_commit(lambda: _release(name, variants))
+
+
+def _release(name, variants):
+    delete_derivatives(variants)
+    if name and not MenuItem.objects.filter(image=name).exists():
+        default_storage.delete(name)
+
+
+def generate(item_id, name):
+    """
+    Render derivatives for ``name`` and record them on the item, unless the
+    item's image changed meanwhile. Returns True if they were recorded.
+    """
+    variants = render(name)
+    if not MenuItem.objects.filter(id=item_id, image=name).update(image_variants=variants):
+        delete_derivatives(variants)
+        return False
+    response_cache.invalidate('menu')
+    return True
+
+
+def _generate_logged(item_id, name):
+    # A bad upload must not fail the request (inline) or kill the worker
+    try:
+        generate(item_id, name)
+    except Exception:
+        logger.exception('menu image derivatives failed for %s (%s)', item_id, name)
+
+
+def _run(item_id, name):
+    try:
+        _generate_logged(item_id, name)
+    finally:
+        close_old_connections()
+
+
+def schedule(item):
+    """Queue derivative generation for an item's image once the current transaction commits"""
+    if not item.image:
+        return
+    item_id, name = item.id, item.image.name
+    if settings.MENU_IMAGE_WORKERS <= 0:
+        transaction.on_commit(lambda: _generate_logged(item_id, name))
+    else:
+        transaction.on_commit(lambda: _executor().submit(_run, item_id, name))
+
+
+def is_current(item):
+    """True if the item's recorded derivatives belong to its current image"""
+    return bool(item.image) and (item.image_variants or {}).get('source') == item.image.name
+
+
+def payload(item, base):
+    """Derivative fields for a menu payload; None until the derivatives are ready"""
+    return variant_fields(item.image.name if item.image else None, item.image_variants, base)
+
+
+def variant_fields(image_name, variants, base):
+    """payload() from an image name and image_variants value"""
+    if not image_name or (variants or {}).get('source') != image_name:
+        return {'image_variants': None, 'image_placeholder': None}
+    urls = {
+        fmt: {width: avatars.absolute(base, default_storage.url(path)) for width, path in variants[fmt].items()}
+        for fmt in FORMATS if fmt in variants
+    }
+    return {
+        'image_variants': {'width': variants['width'], 'height': variants['height'], **urls},
+        'image_placeholder': variants['placeholder'],
+    }
@@ -0,0 +1,144 @@
+"""
+Compiled menu snapshot
+list_menu_items serves plain dicts built once per menu version: one values()
+query, prices and timestamps converted once, media URLs made absolute once
+per host, and positions indexed by category, availability and ingredient
+so a filtered request is a dict lookup plus a list of its results.
+
+A snapshot is valid while both the in-process version (bumped when a menu
+write commits) and the shared 'menu' response-cache namespace token
+(replaced by writes in any worker sharing the cache) are unchanged. The
+token is compared for equality only: it never repeats, even if its cache
+key is culled, so a snapshot cannot be mistaken for current after other
+workers' writes.
+"""
+import threading
+from django.db import transaction
+from admin_api import avatars, ingredients, menu_images, response_cache
+from admin_api.models import MenuItem, MenuItemIngredient
+
+
+FIELDS = ('id', 'name', 'menuName', 'description', 'price', 'category', 'available',
+          'preparation_time', 'ingredients', 'image', 'image_variants', 'image_url', 'created_at')
+MAX_HOSTS = 16
+
+_lock = threading.Lock()
+_version = 0
+_cached = None  # (version key, Snapshot)
+
+
+class Snapshot:
+    """Menu rows plus per-host compiled payloads and filter indexes"""
+
+    def __init__(self, rows, links=()):
+        self.rows = rows
+        self.by_category = {}
+        self.by_available = {True: [], False: []}
+        self.by_category_available = {}
+        positions_by_id = {}
+        for position, row in enumerate(rows):
+            positions_by_id[row['id']] = position
+            self.by_category.setdefault(row['category'], []).append(position)
+            self.by_available[row['available']].append(position)
+            self.by_category_available.setdefault((row['category'], row['available']), []).append(position)
+        # ingredient key -> positions of the items containing it
+        self.by_ingredient = {}
+        for item_id, key in links:
+            if item_id in positions_by_id:
+                self.by_ingredient.setdefault(key, set()).add(positions_by_id[item_id])
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def compiled(self, base):
+        """Payload dicts with media URLs made absolute for ``base``"""
+        items = self._hosts.get(base)
+        if items is None:
+            items = [_payload(row, base) for row in self.rows]
+            with self._lock:
+                if len(self._hosts) >= MAX_HOSTS:
+                    self._hosts.clear()
+                self._hosts[base] = items
+        return items
+
+    def select(self, base, category=None, available=None, exclude_ingredients=()):
+        """
+        Items matching the filters (None means unfiltered), in menu order,
+        leaving out items containing any of ``exclude_ingredients``
+        """
+        items = self.compiled(base)
+        excluded = set()
+        for name in exclude_ingredients:
+            excluded |= self.by_ingredient.get(ingredients.ingredient_key(name), set())
+        if category is None and available is None:
+            if not excluded:
+                return items
+            positions = range(len(items))
+        elif category is None:
+            positions = self.by_available[available]
+        elif available is None:
+            positions = self.by_category.get(category, [])
+        else:
+            positions = self.by_category_available.get((category, available), [])
+        return [items[position] for position in positions if position not in excluded]
+
+    def containing(self, base, name):
+        """Items containing the named ingredient, in menu order"""
+        items = self.compiled(base)
+        positions = self.by_ingredient.get(ingredients.ingredient_key(name), set())
+        return [items[position] for position in sorted(positions)]
+
+
+def _row(values):
+    image = values.pop('image')
+    values['price'] = float(values['price'])
+    values['created_at'] = values['created_at'].isoformat() if values['created_at'] else None
+    values['image_path'] = MenuItem._meta.get_field('image').storage.url(image) if image else None
+    values['image_name'] = image
+    return values
+
+
+def _payload(row, base):
+    return {
+        'id': row['id'],
+        'name': row['name'],
+        'menuName': row['menuName'],
+        'description': row['description'],
+        'price': row['price'],
+        'category': row['category'],
+        'available': row['available'],
+        'preparation_time': row['preparation_time'],
+        'ingredients': row['ingredients'],
+        'image_url': avatars.absolute(base, row['image_path']) or row['image_url'],
+        **menu_images.variant_fields(row['image_name'], row['image_variants'], base),
+        'created_at': row['created_at'],
+    }
+
+
+def _bump():
+    global _version
+    with _lock:
+        _version += 1
+
+
+def invalidate():
+    """Discard the snapshot once the current transaction commits"""
+    transaction.on_commit(_bump)
+
+
+def snapshot():
+    """The current Snapshot, rebuilt at most once per version"""
+    global _cached
+    with _lock:
+        key = (_version, response_cache.version('menu'))  # (counter, random token)
+        if _cached is not None and _cached[0] == key:
+            return _cached[1]
+
+    rows = [_row(values) for values in MenuItem.objects.order_by('category', 'name').values(*FIELDS)]
+    links = MenuItemIngredient.objects.order_by().values_list('menu_item_id', 'ingredient__key')
+    built = Snapshot(rows, links)
+
+    with _lock:
+        # Only publish if no write happened while we were building
+        if key == (_version, response_cache.version('menu')):
+            _cached = (key, built)
+    return built
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:12
+
+from django.db import migrations, models
+
+
+def backfill_daily_revenue(apps, schema_editor):
+    from admin_api.rollups import rebuild_daily_rollups
+    rebuild_daily_rollups(apps.get_model('admin_api', 'Order'), apps.get_model('admin_api', 'DailyRevenue'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_api', '0002_menuitem_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRevenue',
+            fields=[
+                ('dayKey', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('order_count', models.IntegerField(default=0)),
+                ('status_counts', models.JSONField(blank=True, default=dict)),
+                ('type_counts', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'daily_revenue',
+                'ordering': ['dayKey'],
+            },
+        ),
+        migrations.RunPython(backfill_daily_revenue, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_line_items(apps, schema_editor):
+    from admin_api.line_items import backfill_order_line_items
+    backfill_order_line_items(order_model=apps.get_model('admin_api', 'Order'),
+                              line_item_model=apps.get_model('admin_api', 'OrderLineItem'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_api', '0003_dailyrevenue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderLineItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('menu_item_id', models.CharField(blank=True, default='', max_length=50)),
+                ('name', models.CharField(max_length=255)),
+                ('quantity', models.IntegerField(default=1)),
+                ('unit_price', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('line_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('dayKey', models.CharField(max_length=20)),
+                ('order', models.ForeignKey(db_column='order_id', on_delete=django.db.models.deletion.CASCADE, related_name='line_items', to='admin_api.order')),
+            ],
+            options={
+                'db_table': 'order_line_items',
+                'indexes': [models.Index(fields=['dayKey', 'name'], name='line_items_day_name_idx'), models.Index(fields=['name'], name='line_items_name_idx'), models.Index(fields=['menu_item_id'], name='line_items_menu_item_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_line_items, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_api', '0004_orderlineitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdSequence',
+            fields=[
+                ('prefix', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('last_value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'id_sequences',
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+from django.db.models.functions import Trim, Upper
+
+
+def normalize_roles(apps, schema_editor):
+    """Store roles upper-case so role lookups can be exact (indexable) matches"""
+    User = apps.get_model('admin_api', 'User')
+    User.objects.exclude(role=Upper(Trim('role'))).update(role=Upper(Trim('role')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_api', '0006_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_roles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+from collections import defaultdict
+from django.db import migrations, models
+from django.db.models.functions import Lower, Trim
+
+
+def normalize_emails(apps, schema_editor):
+    """
+    Store emails trimmed and lower-case. Where several accounts differ only
+    by case, the most recently used one keeps the address; the others are
+    deactivated with their email cleared so the unique index holds.
+    """
+    User = apps.get_model('admin_api', 'User')
+    accounts = defaultdict(list)
+    users = User.objects.exclude(email=None).only('id', 'email', 'status', 'lastLogin', 'createdAt').order_by('createdAt', 'id')
+    for user in users.iterator():
+        accounts[user.email.strip().lower()].append(user)
+
+    duplicates = []
+    renamed = []
+    for email, group in accounts.items():
+        keep = max(group, key=lambda user: (user.lastLogin is not None, user.lastLogin)) if email else None
+        for user in group:
+            if user is keep:
+                if user.email != email:
+                    user.email = email
+                    renamed.append(user)
+            else:
+                user.email = None
+                if email:
+                    user.status = 'INACTIVE'
+                duplicates.append(user)
+
+    # Free the addresses before the survivors take their canonical form
+    User.objects.bulk_update(duplicates, ['email', 'status'], batch_size=500)
+    User.objects.bulk_update(renamed, ['email'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_api', '0007_normalize_user_roles'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.CheckConstraint(
+                condition=models.Q(email=Lower(Trim('email'))),
+                name='users_email_normalized',
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:41
+
+import core.media
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_api', '0009_menuitem_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='menuitem',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=core.media.hashed_storage, upload_to='menu_items/'),
+        ),
+    ]
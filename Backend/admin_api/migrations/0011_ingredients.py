@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_ingredients(apps, schema_editor):
+    from admin_api.ingredients import backfill_menu_ingredients
+    backfill_menu_ingredients(menu_model=apps.get_model('admin_api', 'MenuItem'),
+                              ingredient_model=apps.get_model('admin_api', 'Ingredient'),
+                              link_model=apps.get_model('admin_api', 'MenuItemIngredient'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_api', '0010_menuitem_image_hashed_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Ingredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('key', models.CharField(max_length=100, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'ingredients',
+                'ordering': ['key'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MenuItemIngredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('ingredient', models.ForeignKey(db_column='ingredient_id', db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='menu_links', to='admin_api.ingredient')),
+                ('menu_item', models.ForeignKey(db_column='menu_item_id', db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='ingredient_links', to='admin_api.menuitem')),
+            ],
+            options={
+                'db_table': 'menu_item_ingredients',
+                'indexes': [models.Index(fields=['menu_item', 'position'], name='menu_ingredient_item_idx')],
+                'constraints': [models.UniqueConstraint(fields=('ingredient', 'menu_item'), name='menu_ingredient_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_ingredients, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+from django.db.models.functions import Trim, Upper
+
+
+def normalize_statuses(apps, schema_editor):
+    """Store statuses upper-case so status filters can be exact (indexable) matches"""
+    User = apps.get_model('admin_api', 'User')
+    User.objects.exclude(status=Upper(Trim('status'))).update(status=Upper(Trim('status')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_api', '0011_ingredients'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_statuses, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+from django.db.models import Value
+from django.db.models.functions import Replace
+
+
+def normalize_day_keys(apps, schema_editor):
+    """Store order day keys as YYYYMMDD so today filters and rollups compare exact keys"""
+    Order = apps.get_model('admin_api', 'Order')
+    Order.objects.filter(dayKey__contains='-').update(dayKey=Replace('dayKey', Value('-'), Value('')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_api', '0012_normalize_user_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_day_keys, migrations.RunPython.noop),
+    ]
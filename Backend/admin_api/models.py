@@ -3,6 +3,8 @@ Django Models for Restaurant Management System
 SQLite Database Schema
 """
 from django.db import models
+from django.db.models.functions import Lower, Trim
+from core.media import hashed_storage
 import uuid
 
 
@@ -34,7 +36,7 @@ class User(models.Model):
     bio = models.TextField(blank=True, null=True)
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='CUSTOMER')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='ACTIVE')
-    avatar = models.TextField(blank=True, null=True)  # Store base64 or URL
+    avatar = models.TextField(blank=True, null=True)  # Media URL path (see admin_api.avatars) or external URL
     password_hash = models.CharField(max_length=255, blank=True, null=True)
     login_attempts = models.IntegerField(default=0)
     createdAt = models.DateTimeField(auto_now_add=True)
@@ -44,6 +46,18 @@ class User(models.Model):
     
     class Meta:
         db_table = 'users'
+        indexes = [
+            models.Index(fields=['role', 'status'], name='users_role_status_idx'),
+            models.Index(fields=['status'], name='users_status_idx'),
+        ]
+        constraints = [
+            # Emails are stored canonical (see profiles.normalize_email), so the
+            # unique index on email is case-insensitive and lookups are exact probes
+            models.CheckConstraint(
+                condition=models.Q(email=Lower(Trim('email'))),
+                name='users_email_normalized',
+            ),
+        ]
         
     def __str__(self):
         return f"{self.id} - {self.fullName or self.name or self.email}"
@@ -73,7 +87,8 @@ class MenuItem(models.Model):
     available = models.BooleanField(default=True)
     preparation_time = models.IntegerField(default=15)  # in minutes
     ingredients = models.JSONField(default=list, blank=True)
-    image = models.ImageField(upload_to='menu_items/', blank=True, null=True)
+    image = models.ImageField(upload_to='menu_items/', storage=hashed_storage, blank=True, null=True)  # Content-hash names
+    image_variants = models.JSONField(default=dict, blank=True)  # Resized derivatives (see admin_api.menu_images)
     image_url = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -81,11 +96,49 @@ class MenuItem(models.Model):
     class Meta:
         db_table = 'menu_items'
         ordering = ['category', 'name']
+        indexes = [
+            models.Index(fields=['category', 'available', 'name'], name='menu_category_avail_idx'),
+            models.Index(fields=['available', 'category', 'name'], name='menu_avail_category_idx'),
+        ]
         
     def __str__(self):
         return f"{self.id} - {self.name}"
 
 
+class Ingredient(models.Model):
+    """Ingredient vocabulary: each distinct name once (see admin_api.ingredients)"""
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=100, unique=True)  # case-folded name
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'ingredients'
+        ordering = ['key']
+        
+    def __str__(self):
+        return self.name
+
+
+class MenuItemIngredient(models.Model):
+    """Menu item -> ingredient links, indexed by ingredient to find the dishes containing one"""
+    menu_item = models.ForeignKey(MenuItem, on_delete=models.CASCADE, related_name='ingredient_links', db_column='menu_item_id', db_index=False)
+    ingredient = models.ForeignKey(Ingredient, on_delete=models.CASCADE, related_name='menu_links', db_column='ingredient_id', db_index=False)
+    position = models.PositiveSmallIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'menu_item_ingredients'
+        # The composite indexes cover both foreign keys
+        constraints = [
+            models.UniqueConstraint(fields=['ingredient', 'menu_item'], name='menu_ingredient_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['menu_item', 'position'], name='menu_ingredient_item_idx'),
+        ]
+        
+    def __str__(self):
+        return f"{self.menu_item_id} - {self.ingredient_id}"
+
+
 class Order(models.Model):
     """Customer orders"""
     STATUS_CHOICES = [
@@ -111,13 +164,20 @@ class Order(models.Model):
     totalFee = models.DecimalField(max_digits=10, decimal_places=2)
     orderStatus = models.CharField(max_length=20, choices=STATUS_CHOICES, default='received')
     orderType = models.CharField(max_length=20, choices=ORDER_TYPE_CHOICES, default='DINE_IN')
-    dayKey = models.CharField(max_length=20)  # YYYY-MM-DD format
+    dayKey = models.CharField(max_length=20)  # YYYYMMDD format
     createdAt = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'orders'
         ordering = ['-createdAt']
+        indexes = [
+            models.Index(fields=['-createdAt', '-id'], name='orders_created_idx'),
+            models.Index(fields=['orderStatus', '-createdAt', '-id'], name='orders_status_created_idx'),
+            models.Index(fields=['orderType', '-createdAt'], name='orders_type_created_idx'),
+            models.Index(fields=['dayKey'], name='orders_daykey_idx'),
+            models.Index(fields=['updated_at'], name='orders_updated_idx'),
+        ]
         
     def __str__(self):
         return f"{self.id} - {self.fullName} - ${self.totalFee}"
@@ -151,3 +211,54 @@ class Setting(models.Model):
         
     def __str__(self):
         return self.key
+
+
+class DailyRevenue(models.Model):
+    """Per-day order rollup maintained alongside order writes"""
+    dayKey = models.CharField(max_length=20, primary_key=True)  # YYYYMMDD format
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    order_count = models.IntegerField(default=0)
+    status_counts = models.JSONField(default=dict, blank=True)  # orderStatus -> count
+    type_counts = models.JSONField(default=dict, blank=True)  # orderType -> count
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'daily_revenue'
+        ordering = ['dayKey']
+        
+    def __str__(self):
+        return f"{self.dayKey} - {self.order_count} orders - ${self.revenue}"
+
+
+class OrderLineItem(models.Model):
+    """One row per item in an order's orderList, mirrored for reporting"""
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='line_items', db_column='order_id')
+    menu_item_id = models.CharField(max_length=50, blank=True, default='')
+    name = models.CharField(max_length=255)
+    quantity = models.IntegerField(default=1)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    line_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    dayKey = models.CharField(max_length=20)  # YYYYMMDD format
+    
+    class Meta:
+        db_table = 'order_line_items'
+        indexes = [
+            models.Index(fields=['dayKey', 'name'], name='line_items_day_name_idx'),
+            models.Index(fields=['name'], name='line_items_name_idx'),
+            models.Index(fields=['menu_item_id'], name='line_items_menu_item_idx'),
+        ]
+        
+    def __str__(self):
+        return f"{self.order_id} - {self.quantity} x {self.name}"
+
+
+class IdSequence(models.Model):
+    """Last number handed out for each ID prefix (order, menu, admin, ...)"""
+    prefix = models.CharField(max_length=50, primary_key=True)
+    last_value = models.BigIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'id_sequences'
+        
+    def __str__(self):
+        return f"{self.prefix} - {self.last_value}"
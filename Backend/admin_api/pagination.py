@@ -0,0 +1,86 @@
+"""
+Keyset (cursor) pagination helpers
+Pages are ordered newest first on (createdAt, id), so each page is an index
+range scan instead of an OFFSET that re-reads every earlier row.
+"""
+import base64
+import json
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+MAX_PAGE_SIZE = 500
+DEFAULT_PAGE_SIZE = 100  # used when a cursor comes without a limit
+
+
+def encode_cursor(created_at, pk):
+    """Opaque cursor pointing just after (created_at, pk)"""
+    raw = json.dumps([created_at.isoformat() if created_at else None, pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor(); raises ValueError on a malformed cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, pk = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise ValueError('Invalid cursor')
+    created = parse_datetime(created_at) if created_at else None
+    if created_at and created is None:
+        raise ValueError('Invalid cursor')
+    return created, pk
+
+
+def parse_limit(raw, default=None):
+    """Parse a page size; None means unpaginated. Raises ValueError on bad input."""
+    if raw in (None, ''):
+        return default
+    try:
+        limit = int(raw)
+    except (ValueError, TypeError):
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_since(raw):
+    """Parse an ISO-8601 ``since`` timestamp into an aware datetime"""
+    if not raw:
+        return None
+    since = parse_datetime(raw)
+    if since is None:
+        raise ValueError('since must be an ISO-8601 timestamp')
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def keyset_page(queryset, limit, cursor=None, time_field='createdAt', pk_field='id'):
+    """
+    Return (rows, next_cursor) for a values() queryset ordered newest first.
+    ``time_field`` and ``pk_field`` must be among the selected values. A
+    cursor always gets a bounded page (DEFAULT_PAGE_SIZE without a limit);
+    only the legacy no-cursor, no-limit call returns every row.
+    """
+    queryset = queryset.order_by(f'-{time_field}', f'-{pk_field}')
+    if cursor:
+        limit = DEFAULT_PAGE_SIZE if limit is None else limit
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(**{f'{time_field}__lt': created_at}) |
+            Q(**{time_field: created_at, f'{pk_field}__lt': pk})
+        )
+
+    if limit is None:
+        return list(queryset), None
+
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last[time_field], last[pk_field])
+    return rows, next_cursor
@@ -0,0 +1,99 @@
+"""
+User resolution for profile endpoints
+Resolves "the user this request means" (by id, else email, else the first
+admin) in one indexed OR query, and caches the resolved profile by id and
+email. Roles are stored upper-case and emails lower-case, so every lookup
+is an exact (indexable) match.
+"""
+from django.conf import settings
+from django.db.models import Case, IntegerField, Q, Value, When
+from admin_api.models import User
+from core.auth import TTLCache
+
+
+ADMIN_ROLE = 'ADMIN'
+
+_profiles = TTLCache(
+    getattr(settings, 'PROFILE_CACHE_SIZE', 1024),
+    getattr(settings, 'PROFILE_CACHE_TTL', 300),
+)
+
+
+def normalize_role(role, default='CUSTOMER'):
+    """Canonical stored form of a role ('Customer ' -> 'CUSTOMER')"""
+    role = (role or '').strip().upper()
+    return role or default
+
+
+def normalize_status(status, default='ACTIVE'):
+    """Canonical stored form of an account status ('active' -> 'ACTIVE')"""
+    status = (status or '').strip().upper()
+    return status or default
+
+
+def normalize_email(email):
+    """Canonical stored form of an email (' Ann@X.com' -> 'ann@x.com'), None if blank"""
+    email = (email or '').strip().lower()
+    return email or None
+
+
+def resolve_user(user_id=None, email=None, fallback_admin=True):
+    """
+    The user matching ``user_id``, else ``email``, else (optionally) the
+    first admin by id, fetched with a single query.
+    """
+    conditions = []
+    ranks = []
+    if user_id:
+        conditions.append(Q(id=user_id))
+        ranks.append(When(id=user_id, then=Value(0)))
+    if email:
+        conditions.append(Q(email=email))
+        ranks.append(When(email=email, then=Value(1)))
+    if fallback_admin:
+        conditions.append(Q(role=ADMIN_ROLE))
+    if not conditions:
+        return None
+
+    query = conditions[0]
+    for condition in conditions[1:]:
+        query |= condition
+    return (
+        User.objects.filter(query)
+        .annotate(match_rank=Case(*ranks, default=Value(2), output_field=IntegerField()))
+        .order_by('match_rank', 'id')
+        .first()
+    )
+
+
+def resolve_profile(user_id=None, email=None, build=None, fallback_admin=True):
+    """
+    Cached ``build(user)`` for the user resolve_user() finds (None if none),
+    keyed by the requested id and email.
+    """
+    key = (user_id or None, email or None, fallback_admin)
+    cached = _profiles.get(key)
+    if cached is not None:
+        return cached
+
+    user = resolve_user(user_id, email, fallback_admin)
+    if user is None:
+        return None
+    profile = build(user)
+    _profiles.set(key, profile)
+    return profile
+
+
+def invalidate(user_id=None, email=None):
+    """Forget cached profiles for a created, changed or deleted user"""
+    if user_id is None and email is None:
+        _profiles.clear()
+        return
+
+    def affected(key, profile):
+        # Requested under this id/email, or resolved to this user via another lookup
+        return (
+            (user_id is not None and (key[0] == user_id or profile['id'] == user_id))
+            or (email and (key[1] == email or profile['email'] == email))
+        )
+    _profiles.discard_where(affected)
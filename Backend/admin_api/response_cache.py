@@ -0,0 +1,133 @@
+"""
+Response cache for read-heavy admin endpoints
+Caches rendered GET responses keyed by endpoint, host and normalized query
+params, grouped into namespaces (menu, categories, settings, reports) that
+write paths invalidate. Responses carry a strong ETag so unchanged data is
+revalidated with a 304.
+
+A namespace's version is a random token replaced on every invalidation,
+not a counter: the version keys live in the same culling cache as the
+entries, and a counter restarting after its key was evicted would revive
+entries stored under its earlier values.
+"""
+import hashlib
+import json
+import uuid
+from datetime import datetime
+from functools import wraps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.utils.encoders import JSONEncoder
+from django.http import HttpResponse, HttpResponseNotModified
+
+
+KEY_PREFIX = 'respcache'
+
+
+def _cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+
+
+def _version_key(namespace):
+    return f'{KEY_PREFIX}:ns:{namespace}'
+
+
+def _token():
+    return uuid.uuid4().hex
+
+
+def _bump(namespaces):
+    _cache().set_many({_version_key(namespace): _token() for namespace in namespaces}, None)
+
+
+def invalidate(*namespaces):
+    """
+    Bump the version of each namespace so every cached entry in it is skipped.
+    Deferred until the current transaction commits, so readers cannot cache
+    pre-commit data under the new version.
+    """
+    transaction.on_commit(lambda: _bump(namespaces))
+
+
+def version(namespace):
+    """Current version token of a namespace, for in-process caches that follow it"""
+    return _versions([namespace])[0]
+
+
+def _versions(namespaces):
+    cache = _cache()
+    keys = [_version_key(ns) for ns in namespaces]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # First use, or the key was culled: start from a token no entry was stored under
+            token = _token()
+            cache.add(key, token, None)
+            found[key] = cache.get(key) or token
+    return [found[key] for key in keys]
+
+
+def _entry_key(request, endpoint, namespaces):
+    params = sorted((key, sorted(values)) for key, values in request.GET.lists())
+    raw = json.dumps([
+        endpoint,
+        request.get_host(),
+        params,
+        _versions(namespaces),
+        datetime.now().date().isoformat(),  # date-relative reports roll over at midnight
+    ])
+    return f'{KEY_PREFIX}:{endpoint}:{hashlib.sha1(raw.encode()).hexdigest()}'
+
+
+def _etag_matches(request, etag):
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(',')]
+    return '*' in candidates or etag in candidates or f'W/{etag}' in candidates
+
+
+def _respond(request, etag, body):
+    if _etag_matches(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    # Let clients keep a copy but always revalidate it
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def cached_response(endpoint, namespaces):
+    """
+    Cache successful GET responses of a view (apply beneath @api_view).
+    Other methods pass straight through to the view.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+
+            cache = _cache()
+            key = _entry_key(request, endpoint, namespaces)
+            entry = cache.get(key)
+            if entry is not None:
+                etag, body = entry
+                return _respond(request, etag, body)
+
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200 or not hasattr(response, 'data'):
+                return response
+
+            body = json.dumps(response.data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            cache.set(key, (etag, body), _timeout())
+            return _respond(request, etag, body)
+        return wrapper
+    return decorator
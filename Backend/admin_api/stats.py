@@ -0,0 +1,117 @@
+"""
+Dashboard statistics engine
+Computes every dashboard figure with one conditional-aggregation query per table
+"""
+from datetime import datetime
+from django.db.models import Q, Sum, Count
+from admin_api.models import User, MenuItem, Order
+from admin_api.ids import ROLE_PREFIXES
+
+
+# Public field order of the dashboard_stats payload
+STAT_FIELDS = (
+    'total_orders',
+    'total_revenue',
+    'pending_orders',
+    'preparing_orders',
+    'ready_orders',
+    'completed_orders',
+    'today_orders',
+    'today_revenue',
+    'total_menu_items',
+    'total_staff',
+    'total_users',
+    'active_customers',
+    'avg_order_value',
+)
+
+# Stored (upper-case) roles counted as staff
+STAFF_ROLES = tuple(role for role, prefix in ROLE_PREFIXES.items() if prefix == 'staff')
+
+# Fields derived from other figures rather than queried directly
+DERIVED_FIELDS = {
+    'avg_order_value': ('total_orders', 'total_revenue'),
+}
+
+
+def _order_aggregates(today_key):
+    """Aggregate expressions over the orders table"""
+    today = Q(dayKey=today_key)
+    return {
+        'total_orders': Count('id'),
+        'total_revenue': Sum('totalFee'),
+        'pending_orders': Count('id', filter=Q(orderStatus='pending')),
+        'preparing_orders': Count('id', filter=Q(orderStatus='preparing')),
+        'ready_orders': Count('id', filter=Q(orderStatus='ready')),
+        'completed_orders': Count('id', filter=Q(orderStatus='completed')),
+        'today_orders': Count('id', filter=today),
+        'today_revenue': Sum('totalFee', filter=today),
+    }
+
+
+def _user_aggregates():
+    """Aggregate expressions over the users table"""
+    return {
+        'total_users': Count('id'),
+        'active_customers': Count('id', filter=Q(role='CUSTOMER', status='ACTIVE')),
+        'total_staff': Count('id', filter=Q(role__in=STAFF_ROLES)),
+    }
+
+
+def _menu_aggregates():
+    """Aggregate expressions over the menu_items table"""
+    return {
+        'total_menu_items': Count('id'),
+    }
+
+
+def parse_fields(raw):
+    """
+    Parse a comma-separated ``fields`` parameter.
+    Returns None when every field is requested; raises ValueError on unknown names.
+    """
+    if not raw:
+        return None
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in STAT_FIELDS]
+    if unknown:
+        raise ValueError(f'Unknown stats fields: {", ".join(unknown)}')
+    return fields or None
+
+
+def _run(model, aggregates, wanted):
+    """Run a single aggregate() restricted to the wanted keys"""
+    selected = {key: expr for key, expr in aggregates.items() if key in wanted}
+    if not selected:
+        return {}
+    return model.objects.aggregate(**selected)
+
+
+def dashboard_stats(fields=None):
+    """
+    Compute dashboard statistics.
+    Only the tables needed by ``fields`` are queried, each exactly once.
+    """
+    requested = list(fields) if fields else list(STAT_FIELDS)
+
+    wanted = set(requested)
+    for field in requested:
+        wanted.update(DERIVED_FIELDS.get(field, ()))
+
+    today_key = datetime.now().date().strftime('%Y%m%d')  # Format as YYYYMMDD
+
+    raw = {}
+    raw.update(_run(Order, _order_aggregates(today_key), wanted))
+    raw.update(_run(User, _user_aggregates(), wanted))
+    raw.update(_run(MenuItem, _menu_aggregates(), wanted))
+
+    if 'avg_order_value' in wanted:
+        total_orders = raw.get('total_orders') or 0
+        total_revenue = raw.get('total_revenue') or 0
+        raw['avg_order_value'] = round(float(total_revenue) / total_orders, 2) if total_orders > 0 else 0
+
+    for key in ('total_revenue', 'today_revenue'):
+        if key in raw:
+            raw[key] = float(raw[key] or 0)
+
+    return {field: raw[field] for field in STAT_FIELDS if field in requested}
@@ -7,6 +7,7 @@ from admin_api import views
 urlpatterns = [
     # Authentication
     path('auth/login', views.login_user, name='login_user'),
+    path('auth/logout', views.logout_user, name='logout_user'),
     
     # Dashboard
     path('dashboard/stats', views.dashboard_stats, name='dashboard_stats'),
@@ -15,17 +16,24 @@ urlpatterns = [
     # User Management
     path('users', views.list_users, name='list_users'),
     path('users/create', views.create_user, name='create_user'),
+    path('users/bulk', views.bulk_import_users, name='bulk_import_users'),
+    path('users/export', views.export_users, name='export_users'),
     path('users/<str:user_id>', views.user_detail, name='user_detail'),
     
     # Menu Management
     path('menu', views.list_menu_items, name='list_menu_items'),
     path('menu/create', views.create_menu_item, name='create_menu_item'),
+    path('menu/bulk-availability', views.bulk_menu_availability, name='bulk_menu_availability'),
     path('menu/<str:item_id>', views.menu_item_detail, name='menu_item_detail'),
+    path('ingredients', views.list_ingredients, name='list_ingredients'),
+    path('ingredients/<str:name>/menu', views.ingredient_menu_items, name='ingredient_menu_items'),
     
     # Order Management
     path('orders', views.list_orders, name='list_orders'),
     path('orders/<str:order_id>', views.order_detail, name='order_detail'),
     path('orders/<str:order_id>/status', views.update_order_status, name='update_order_status'),
+    path('events/orders', views.order_events, name='order_events'),
+    path('events/menu', views.menu_events, name='menu_events'),
     
     # Categories
     path('categories', views.categories, name='categories'),
@@ -1,72 +1,99 @@
 """
 Admin API Views - Using Django ORM with SQLite
 """
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, authentication_classes
 from rest_framework.response import Response
 from rest_framework import status
 from datetime import datetime, timedelta
 from django.utils import timezone
-from admin_api.models import User, MenuItem, Order, Category, Setting
+from admin_api.models import User, MenuItem, Order, Category, Setting, Ingredient
+from admin_api import stats, rollups, line_items, category_map, pagination, events, ids, response_cache, listing, avatars, profiles, bulk_users, menu_images, menu_snapshot, ingredients
+from admin_api.response_cache import cached_response
+from django.http import StreamingHttpResponse, HttpResponseNotAllowed
+from django.db import transaction
 from django.db.models import Q, Sum, Count
-import hashlib
-from collections import defaultdict
-import re
+from core import passwords, auth, tokens
 
 
 # ==================== HELPER FUNCTIONS ====================
 
 def get_next_order_number():
     """Get the next available order number"""
-    try:
-        last_order = Order.objects.filter(id__startswith='order').order_by('-id').first()
-        if last_order:
-            match = re.match(r'order(\d+)', last_order.id)
-            if match:
-                next_num = int(match.group(1)) + 1
-                return f"order{next_num:03d}"
-        return "order001"
-    except:
-        return "order001"
+    return ids.next_id('order')
 
 
 def get_next_user_id(role):
     """Get the next available user ID based on role"""
-    try:
-        role_prefix_map = {
-            'ADMIN': 'admin',
-            'CUSTOMER': 'customer',
-            'CHEF': 'staff',
-            'CASHIER': 'staff',
-            'WAITER': 'staff',
-            'SECURITY_GUARD': 'staff',
-            'STAFF': 'staff'
-        }
-        
-        prefix = role_prefix_map.get(role.upper(), 'customer')
-        last_user = User.objects.filter(id__startswith=prefix).order_by('-id').first()
-        
-        if last_user:
-            match = re.match(rf'{prefix}(\d+)', last_user.id)
-            if match:
-                next_num = int(match.group(1)) + 1
-                return f"{prefix}{next_num:02d}"
-        return f"{prefix}01"
-    except:
-        return f"user_{int(datetime.now().timestamp())}"
+    return ids.next_id(ids.prefix_for_role(role))
 
 
 def get_next_menu_id():
     """Get the next available menu item ID"""
-    try:
-        last_menu = MenuItem.objects.filter(id__startswith='menu').order_by('-id').first()
-        if last_menu:
-            match = re.match(r'menu(\d+)', last_menu.id)
-            if match:
-                next_num = int(match.group(1)) + 1
-                return f"menu{next_num:03d}"
-        return "menu001"
-    except:
-        return "menu001"
+    return ids.next_id('menu')
+
+
+def sync_order_projections(before, order, items_changed=True):
+    """Keep tables derived from orders in step with an order write"""
+    rollups.apply_order_change(before, rollups.order_snapshot(order))
+    if items_changed:
+        line_items.sync_order_line_items(order)
+    response_cache.invalidate('reports')
+
+
+def invalidate_menu_caches():
+    """Drop everything derived from menu items and categories"""
+    category_map.invalidate()
+    menu_snapshot.invalidate()
+    response_cache.invalidate('menu', 'categories', 'reports')
+
+
+# Fields list_orders can return, in payload order; updatedAt only on request
+ORDER_FIELDS = ['id', 'fullName', 'phoneNumber', 'address', 'orderList', 'totalFee',
+                'orderStatus', 'orderType', 'dayKey', 'createdAt']
+ORDER_OPTIONAL_FIELDS = ['updatedAt']
+ORDER_FIELD_COLUMNS = {'updatedAt': 'updated_at'}
+
+
+def parse_order_fields(raw):
+    """Parse a comma-separated ``fields`` projection for orders (ValueError on unknown names)"""
+    if not raw:
+        return ORDER_FIELDS
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in ORDER_FIELDS + ORDER_OPTIONAL_FIELDS]
+    if unknown:
+        raise ValueError(f'Unknown order fields: {", ".join(unknown)}')
+    return fields or ORDER_FIELDS
+
+
+def serialize_order_row(row, fields):
+    """Convert a values() row of an order to the API representation"""
+    data = {}
+    for field in fields:
+        value = row[ORDER_FIELD_COLUMNS.get(field, field)]
+        if field == 'totalFee':
+            value = float(value)
+        elif field in ('createdAt', 'updatedAt'):
+            value = value.isoformat() if value else None
+        data[field] = value
+    return data
+
+
+def parse_date_range(request):
+    """
+    Read optional start_date/end_date (YYYY-MM-DD) query params.
+    Returns (start_key, end_key) as YYYYMMDD day keys; raises ValueError on bad dates.
+    """
+    keys = []
+    for param in ('start_date', 'end_date'):
+        value = request.GET.get(param)
+        if value:
+            try:
+                keys.append(datetime.strptime(value, '%Y-%m-%d').strftime('%Y%m%d'))
+            except ValueError:
+                raise ValueError(f'{param} must be in YYYY-MM-DD format')
+        else:
+            keys.append(None)
+    return keys[0], keys[1]
 
 
 # ==================== AUTHENTICATION ====================
@@ -75,7 +102,7 @@ def get_next_menu_id():
 def login_user(request):
     """Login user with email and password"""
     try:
-        email = request.data.get('email')
+        email = profiles.normalize_email(request.data.get('email'))
         password = request.data.get('password')
         
         if not email or not password:
@@ -84,42 +111,60 @@ def login_user(request):
                 'error': 'Email and password are required'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Find user by email
-        try:
-            user = User.objects.get(email=email)
-        except User.DoesNotExist:
+        # Lockouts, unknown emails and repeat logins are answered from memory
+        result = auth.service.authenticate(email, password, auth.client_ip(request))
+        
+        if result.outcome == 'locked':
             return Response({
                 'success': False,
-                'error': 'Invalid email or password'
-            }, status=status.HTTP_401_UNAUTHORIZED)
-        
-        # Verify password (hashed with SHA-256)
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
+                'error': 'Too many failed login attempts. Please try again later.'
+            }, status=status.HTTP_429_TOO_MANY_REQUESTS, headers={'Retry-After': str(result.retry_after)})
         
-        if user.password_hash != password_hash:
+        if result.outcome == 'invalid':
             return Response({
                 'success': False,
                 'error': 'Invalid email or password'
             }, status=status.HTTP_401_UNAUTHORIZED)
         
         # Check if user is active
-        if user.status != 'active':
+        if result.outcome == 'inactive':
             return Response({
                 'success': False,
                 'error': 'Account is inactive. Please contact administrator.'
             }, status=status.HTTP_403_FORBIDDEN)
         
         # Return user data
+        user = result.principal
         return Response({
             'success': True,
-            'id': user.id,
-            'name': user.fullName,
-            'email': user.email,
-            'role': user.role,
-            'phoneNumber': user.phoneNumber,
-            'avatar': user.avatar or ''
+            'id': user['id'],
+            'name': user['fullName'],
+            'email': user['email'],
+            'role': user['role'],
+            'phoneNumber': user['phoneNumber'],
+            'avatar': avatars.avatar_url(request, user['avatar']) or '',
+            **tokens.issue_tokens(user)
         })
         
+    except passwords.HashingBusy as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '1'})
+    except Exception as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['POST'])
+@authentication_classes([])  # an expired access token must not block logout
+def logout_user(request):
+    """Revoke the caller's access token and the posted refresh token"""
+    try:
+        tokens.revoke_presented(request, request.data.get('refresh'))
+        return Response({'success': True, 'message': 'Logged out'})
     except Exception as e:
         return Response({
             'success': False,
@@ -131,52 +176,19 @@ def login_user(request):
 
 @api_view(['GET'])
 def dashboard_stats(request):
-    """Get dashboard statistics"""
+    """Get dashboard statistics (optionally only the comma-separated ``fields``)"""
     try:
-        # Get all orders
-        orders = Order.objects.all()
-        total_orders = orders.count()
-        total_revenue = orders.aggregate(Sum('totalFee'))['totalFee__sum'] or 0
-        
-        # Orders by status
-        pending_orders = orders.filter(orderStatus='pending').count()
-        preparing_orders = orders.filter(orderStatus='preparing').count()
-        ready_orders = orders.filter(orderStatus='ready').count()
-        completed_orders = orders.filter(orderStatus='completed').count()
-        
-        # Today's stats
-        today = datetime.now().date()
-        today_key = today.strftime('%Y%m%d')  # Format as YYYYMMDD
-        today_orders = orders.filter(dayKey=today_key)
-        today_revenue = today_orders.aggregate(Sum('totalFee'))['totalFee__sum'] or 0
-        
-        # Total users
-        total_users = User.objects.count()
-        
-        # Calculate average order value
-        avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
-        
-        # Active customers and staff
-        active_customers = User.objects.filter(role='customer', status='active').count()
-        total_staff = User.objects.filter(role='staff').count()
+        try:
+            fields = stats.parse_fields(request.GET.get('fields'))
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         return Response({
             'success': True,
-            'data': {
-                'total_orders': total_orders,
-                'total_revenue': float(total_revenue),
-                'pending_orders': pending_orders,
-                'preparing_orders': preparing_orders,
-                'ready_orders': ready_orders,
-                'completed_orders': completed_orders,
-                'today_orders': today_orders.count(),
-                'today_revenue': float(today_revenue),
-                'total_menu_items': MenuItem.objects.count(),
-                'total_staff': total_staff,
-                'total_users': total_users,
-                'active_customers': active_customers,
-                'avg_order_value': round(avg_order_value, 2),
-            }
+            'data': stats.dashboard_stats(fields)
         })
     except Exception as e:
         return Response({
@@ -189,24 +201,23 @@ def dashboard_stats(request):
 def dashboard_charts(request):
     """Get data for dashboard charts"""
     try:
-        # Revenue by day (last 7 days)
+        # Revenue by day (last 7 days, oldest first) from the daily rollup
+        dates = [datetime.now().date() - timedelta(days=i) for i in range(6, -1, -1)]
+        rows = rollups.daily_rows(dates)
+        
         revenue_by_day = []
         orders_by_day = []
         
-        for i in range(6, -1, -1):  # Last 7 days, reversed
-            date = (datetime.now().date() - timedelta(days=i))
-            day_key = date.strftime('%Y%m%d')  # Format as YYYYMMDD
-            
-            day_orders = Order.objects.filter(dayKey=day_key)
-            revenue = day_orders.aggregate(Sum('totalFee'))['totalFee__sum'] or 0
+        for date in dates:
+            row = rows.get(date.strftime('%Y%m%d'))  # Format as YYYYMMDD
             
             revenue_by_day.append({
                 'date': date.strftime('%Y-%m-%d'),
-                'revenue': float(revenue)
+                'revenue': float(row.revenue) if row else 0.0
             })
             orders_by_day.append({
                 'date': date.strftime('%Y-%m-%d'),
-                'count': day_orders.count()
+                'count': row.order_count if row else 0
             })
         
         return Response({
@@ -225,10 +236,38 @@ def dashboard_charts(request):
 
 # ==================== USER MANAGEMENT ====================
 
+# Columns list_users returns; avatar only with include=avatar
+USER_LIST_FIELDS = ['id', 'fullName', 'name', 'email', 'phoneNumber', 'phone', 'address', 'bio',
+                    'role', 'status', 'createdAt', 'lastLogin']
+
+
+def user_list_batch(batch, media_base):
+    """Convert a batch of user values() rows to the API representation"""
+    listing.localize_batch(batch, ['createdAt', 'lastLogin'])
+    for row in batch:
+        row['created_at'] = row['createdAt']
+        if 'avatar' in row:
+            row['avatarThumbnail'] = avatars.absolute(media_base, avatars.thumbnail_path(row['avatar']))
+            row['avatar'] = avatars.absolute(media_base, row['avatar'])
+    return batch
+
+
 @api_view(['GET'])
 def list_users(request):
-    """List all users with optional filtering"""
+    """
+    List users with optional role/status filtering.
+    The avatar column is only returned with include=avatar. With limit/cursor
+    the list is paginated (newest first); otherwise it is streamed in batches.
+    """
     try:
+        try:
+            limit = pagination.parse_limit(request.GET.get('limit'))
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
         users = User.objects.all()
         
         # Apply filters
@@ -238,41 +277,33 @@ def list_users(request):
         if role:
             users = users.filter(role=role)
         if user_status:
-            users = users.filter(status=user_status)
+            users = users.filter(status=profiles.normalize_status(user_status))
         
-        # Convert to dict
-        users_data = []
-        for user in users:
-            # Convert UTC to local timezone for display
-            created_at = user.createdAt
-            if created_at and timezone.is_aware(created_at):
-                created_at = timezone.localtime(created_at)
-            
-            last_login = user.lastLogin
-            if last_login and timezone.is_aware(last_login):
-                last_login = timezone.localtime(last_login)
+        include = {value.strip() for value in request.GET.get('include', '').split(',') if value.strip()}
+        columns = USER_LIST_FIELDS + (['avatar'] if 'avatar' in include else [])
+        users = users.values(*columns)
+        media_base = avatars.media_base(request)
+        
+        cursor = request.GET.get('cursor')
+        if limit is not None or cursor:
+            try:
+                page, next_cursor = pagination.keyset_page(users, limit, cursor)
+            except ValueError as e:
+                return Response({
+                    'success': False,
+                    'error': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
             
-            users_data.append({
-                'id': user.id,
-                'fullName': user.fullName,
-                'name': user.name,
-                'email': user.email,
-                'phoneNumber': user.phoneNumber,
-                'phone': user.phone,
-                'address': user.address,
-                'bio': user.bio,
-                'role': user.role,
-                'status': user.status,
-                'avatar': user.avatar,
-                'createdAt': created_at.isoformat() if created_at else None,
-                'created_at': created_at.isoformat() if created_at else None,
-                'lastLogin': last_login.isoformat() if last_login else None,
+            return Response({
+                'success': True,
+                'data': user_list_batch(page, media_base),
+                'next_cursor': next_cursor
             })
         
-        return Response({
-            'success': True,
-            'data': users_data
-        })
+        # Unpaginated: stream batches so memory stays flat however many users exist
+        batches = (user_list_batch(batch, media_base) for batch in listing.batched(users.iterator(chunk_size=listing.BATCH_SIZE)))
+        return StreamingHttpResponse(listing.streaming_content(request, listing.stream_json_array(batches)),
+                                     content_type='application/json')
     except Exception as e:
         return Response({
             'success': False,
@@ -292,23 +323,28 @@ def create_user(request):
         password = data.get('password')
         password_hash = ''
         if password:
-            password_hash = hashlib.sha256(password.encode()).hexdigest()
+            password_hash = passwords.hash_password(password)
         
         user = User.objects.create(
             id=user_id,
             fullName=data.get('fullName', data.get('name', '')),
             name=data.get('name', data.get('fullName', '')),
-            email=data.get('email'),
+            email=profiles.normalize_email(data.get('email')),
             phoneNumber=data.get('phoneNumber', data.get('phone', '')),
             phone=data.get('phone', data.get('phoneNumber', '')),
             address=data.get('address', ''),
             bio=data.get('bio', ''),
-            role=role.upper(),
-            status=data.get('status', 'ACTIVE').upper(),
-            avatar=data.get('avatar', ''),
+            role=profiles.normalize_role(role),
+            status=profiles.normalize_status(data.get('status')),
+            avatar=avatars.store_avatar(data.get('avatar', '')),
             password_hash=password_hash,
             login_attempts=0,
         )
+        auth.service.invalidate(email=user.email)
+        if user.role == profiles.ADMIN_ROLE:
+            profiles.invalidate()  # may become the admin fallback
+        else:
+            profiles.invalidate(user_id=user.id, email=user.email)
         
         return Response({
             'success': True,
@@ -327,6 +363,67 @@ def create_user(request):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+def bulk_import_users(request):
+    """
+    Import users from a streamed CSV or NDJSON body (?dry_run=true to only
+    validate). Returns counts and per-row errors.
+    """
+    try:
+        try:
+            fmt = bulk_users.detect_format(request.content_type, request.GET.get('type'))
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        dry_run = request.GET.get('dry_run', '').lower() in ('1', 'true', 'yes')
+        # Read the raw stream; request.data would buffer and parse the whole body
+        report = bulk_users.import_users(request.stream, fmt, dry_run=dry_run)
+        
+        if report['created'] and not dry_run:
+            # New emails may be remembered as unknown; new admins change the profile fallback
+            auth.service.invalidate()
+            profiles.invalidate()
+        
+        return Response({
+            'success': report['failed'] == 0,
+            'data': report
+        }, status=status.HTTP_200_OK if report['created'] or not report['failed'] else status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+def export_users(request):
+    """Stream every user (no password hashes or avatars) as CSV or NDJSON (?type=)"""
+    try:
+        fmt = request.GET.get('type', 'csv')
+        if fmt not in bulk_users.FORMATS:
+            return Response({
+                'success': False,
+                'error': f"Unsupported format {fmt!r}; use {' or '.join(bulk_users.FORMATS)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        users = User.objects.all()
+        if request.GET.get('role'):
+            users = users.filter(role=profiles.normalize_role(request.GET['role']))
+        
+        response = StreamingHttpResponse(listing.streaming_content(request, bulk_users.export_users(fmt, users)),
+                                         content_type=bulk_users.FORMATS[fmt])
+        response['Content-Disposition'] = f'attachment; filename="users.{fmt}"'
+        return response
+    except Exception as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['GET', 'PUT', 'DELETE'])
 def user_detail(request, user_id):
     """Get, update, or delete a user"""
@@ -352,7 +449,7 @@ def user_detail(request, user_id):
                     'bio': user.bio,
                     'role': user.role,
                     'status': user.status,
-                    'avatar': user.avatar,
+                    'avatar': avatars.avatar_url(request, user.avatar),
                     'createdAt': created_at.isoformat() if created_at else None,
                 }
             })
@@ -367,7 +464,7 @@ def user_detail(request, user_id):
             if 'name' in data:
                 user.name = data['name']
             if 'email' in data:
-                user.email = data['email']
+                user.email = profiles.normalize_email(data['email'])
             if 'phoneNumber' in data:
                 user.phoneNumber = data['phoneNumber']
                 user.phone = data['phoneNumber']
@@ -378,15 +475,29 @@ def user_detail(request, user_id):
             if 'bio' in data:
                 user.bio = data['bio']
             if 'role' in data:
-                user.role = data['role'].upper()
+                user.role = profiles.normalize_role(data['role'])
             if 'status' in data:
-                user.status = data['status'].upper()
+                user.status = profiles.normalize_status(data['status'])
             if 'avatar' in data:
-                user.avatar = data['avatar']
+                try:
+                    user.avatar = avatars.store_avatar(data['avatar'])
+                except ValueError as e:
+                    return Response({
+                        'success': False,
+                        'error': str(e)
+                    }, status=status.HTTP_400_BAD_REQUEST)
             if 'password' in data:
-                user.password_hash = hashlib.sha256(data['password'].encode()).hexdigest()
+                user.password_hash = passwords.hash_password(data['password'])
             
             user.save()
+            auth.service.invalidate(user_id=user.id, email=user.email)
+            if 'role' in data:
+                profiles.invalidate()  # a role change can move the admin fallback
+            else:
+                profiles.invalidate(user_id=user.id, email=user.email)
+            if {'role', 'status', 'password'} & set(data):
+                # Tokens carry the old role; make the user sign in again
+                tokens.revocations.revoke_user(user.id)
             
             return Response({
                 'success': True,
@@ -395,6 +506,9 @@ def user_detail(request, user_id):
         
         elif request.method == 'DELETE':
             user.delete()
+            auth.service.invalidate(user_id=user.id, email=user.email)
+            profiles.invalidate(user_id=user.id, email=user.email)
+            tokens.revocations.revoke_user(user.id)
             return Response({
                 'success': True,
                 'message': 'User deleted successfully'
@@ -415,41 +529,20 @@ def user_detail(request, user_id):
 # ==================== MENU MANAGEMENT ====================
 
 @api_view(['GET'])
+@cached_response('menu', ['menu'])
 def list_menu_items(request):
     """List all menu items with optional filtering"""
     try:
-        items = MenuItem.objects.all()
-        
         # Apply filters
-        category = request.GET.get('category')
+        category = request.GET.get('category') or None
         available = request.GET.get('available')
-        
-        if category:
-            items = items.filter(category=category)
         if available is not None:
-            items = items.filter(available=available.lower() == 'true')
+            available = available.lower() == 'true'
+        # Allergen filter: ?exclude_ingredients=peanuts,milk
+        exclude = [name for name in request.GET.get('exclude_ingredients', '').split(',') if name.strip()]
         
-        # Convert to dict
-        items_data = []
-        for item in items:
-            # Build full image URL if image exists
-            image_url = None
-            if item.image:
-                image_url = request.build_absolute_uri(item.image.url)
-            
-            items_data.append({
-                'id': item.id,
-                'name': item.name,
-                'menuName': item.menuName,
-                'description': item.description,
-                'price': float(item.price),
-                'category': item.category,
-                'available': item.available,
-                'preparation_time': item.preparation_time,
-                'ingredients': item.ingredients,
-                'image_url': image_url or item.image_url,
-                'created_at': item.created_at.isoformat() if item.created_at else None,
-            })
+        # Precompiled dicts and indexes, rebuilt only after menu writes
+        items_data = menu_snapshot.snapshot().select(avatars.media_base(request), category, available, exclude)
         
         return Response({
             'success': True,
@@ -487,33 +580,37 @@ def create_menu_item(request):
         else:
             available = bool(available_str)
         
-        # Parse ingredients JSON if provided as string
-        ingredients = []
-        if data.get('ingredients'):
-            try:
-                if isinstance(data['ingredients'], str):
-                    ingredients = eval(data['ingredients']) if data['ingredients'] else []
-                else:
-                    ingredients = data['ingredients']
-            except:
-                ingredients = []
+        # Ingredients come as a list, a JSON array string or comma-separated text
+        try:
+            ingredient_names = ingredients.parse_ingredients(data.get('ingredients'))
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         # Handle image file if provided
         image_file = request.FILES.get('image') if request.FILES else None
         
-        menu_item = MenuItem.objects.create(
-            id=menu_id,
-            name=data.get('name', ''),
-            menuName=data.get('menuName', data.get('name', '')),
-            description=data.get('description', ''),
-            price=price,
-            category=data.get('category', 'Other'),
-            available=available,
-            preparation_time=prep_time,
-            ingredients=ingredients,
-            image=image_file,
-            image_url=data.get('image_url', ''),
-        )
+        # The item and its ingredient links are written together, so filters never miss an item
+        with transaction.atomic():
+            menu_item = MenuItem.objects.create(
+                id=menu_id,
+                name=data.get('name', ''),
+                menuName=data.get('menuName', data.get('name', '')),
+                description=data.get('description', ''),
+                price=price,
+                category=data.get('category', 'Other'),
+                available=available,
+                preparation_time=prep_time,
+                ingredients=ingredient_names,
+                image=image_file,
+                image_url=data.get('image_url', ''),
+            )
+            ingredients.sync_menu_item_ingredients(menu_item)
+            invalidate_menu_caches()
+            # Derivatives are rendered in the background; the payload lists them once ready
+            menu_images.schedule(menu_item)
         
         # Build full image URL if image exists
         image_url = None
@@ -562,6 +659,7 @@ def menu_item_detail(request, item_id):
                     'preparation_time': item.preparation_time,
                     'ingredients': item.ingredients,
                     'image_url': image_url or item.image_url,
+                    **menu_images.payload(item, avatars.media_base(request)),
                 }
             })
         
@@ -598,26 +696,33 @@ def menu_item_detail(request, item_id):
                 except (ValueError, TypeError):
                     item.preparation_time = 15
             
-            if 'ingredients' in data:
+            ingredients_changed = 'ingredients' in data
+            if ingredients_changed:
                 try:
-                    if isinstance(data['ingredients'], str):
-                        item.ingredients = eval(data['ingredients']) if data['ingredients'] else []
-                    else:
-                        item.ingredients = data['ingredients']
-                except:
-                    item.ingredients = []
-            
-            # Handle image file upload
-            if 'image' in request.FILES:
-                # Delete old image if it exists
-                if item.image:
-                    item.image.delete()
-                item.image = request.FILES['image']
+                    item.ingredients = ingredients.parse_ingredients(data['ingredients'])
+                except ValueError as e:
+                    return Response({
+                        'success': False,
+                        'error': str(e)
+                    }, status=status.HTTP_400_BAD_REQUEST)
             
             if 'image_url' in data:
                 item.image_url = data['image_url']
             
-            item.save()
+            new_image = 'image' in request.FILES
+            with transaction.atomic():
+                # Handle image file upload
+                if new_image:
+                    # Delete old image (unless shared) and its derivatives once the save commits
+                    menu_images.release(item)
+                    item.image = request.FILES['image']
+                    item.image_variants = {}
+                item.save()
+                if ingredients_changed:
+                    ingredients.sync_menu_item_ingredients(item)
+                invalidate_menu_caches()
+                if new_image:
+                    menu_images.schedule(item)
             
             # Build full image URL if image exists
             image_url = None
@@ -634,10 +739,11 @@ def menu_item_detail(request, item_id):
             })
         
         elif request.method == 'DELETE':
-            # Delete image file if it exists
-            if item.image:
-                item.image.delete()
-            item.delete()
+            with transaction.atomic():
+                # Delete image file (unless shared) and derivatives once the delete commits
+                menu_images.release(item)
+                item.delete()
+                invalidate_menu_caches()
             return Response({
                 'success': True,
                 'message': 'Menu item deleted successfully'
@@ -655,44 +761,160 @@ def menu_item_detail(request, item_id):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def parse_name_list(value):
+    """A list of non-empty strings from a JSON list or comma-separated text"""
+    if value is None or value == '':
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, (list, tuple)) or not all(isinstance(v, str) for v in value):
+        raise ValueError('Expected a list of strings')
+    return [v.strip() for v in value if v.strip()]
+
+
+@api_view(['POST'])
+def bulk_menu_availability(request):
+    """
+    Set availability for many menu items at once.
+    Body: {"available": false, "ids": [...], "categories": [...], "ingredients": [...]};
+    items matching any selector are updated with a single UPDATE.
+    """
+    try:
+        data = request.data
+        available = data.get('available')
+        if isinstance(available, str) and available.lower() in ('true', 'false'):
+            available = available.lower() == 'true'
+        if not isinstance(available, bool):
+            return Response({
+                'success': False,
+                'error': 'available must be true or false'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            item_ids = parse_name_list(data.get('ids'))
+            category_names = parse_name_list(data.get('categories'))
+            ingredient_names = parse_name_list(data.get('ingredients'))
+        except ValueError as e:
+            return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if not (item_ids or category_names or ingredient_names):
+            return Response({
+                'success': False,
+                'error': 'Provide ids, categories or ingredients'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        selector = Q(id__in=item_ids) | Q(category__in=category_names)
+        if ingredient_names:
+            selector |= Q(id__in=ingredients.menu_item_ids_containing(ingredient_names))
+        
+        with transaction.atomic():
+            # Only rows that actually change, so timestamps and caches stay put otherwise
+            updated = (
+                MenuItem.objects.filter(selector).exclude(available=available)
+                .update(available=available, updated_at=timezone.now())
+            )
+            if updated:
+                invalidate_menu_caches()
+                events.publish_menu_event('menu.availability', {
+                    'available': available,
+                    'updated': updated,
+                    'ids': item_ids,
+                    'categories': category_names,
+                    'ingredients': ingredient_names,
+                })
+        
+        return Response({
+            'success': True,
+            'data': {
+                'available': available,
+                'updated': updated,
+            }
+        })
+    except Exception as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@cached_response('ingredients', ['menu'])
+def list_ingredients(request):
+    """Ingredient vocabulary with the number of dishes using each"""
+    try:
+        rows = Ingredient.objects.annotate(dishes=Count('menu_links')).values('id', 'name', 'dishes')
+        return Response({'success': True, 'data': list(rows)})
+    except Exception as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+def ingredient_menu_items(request, name):
+    """Menu items containing an ingredient (e.g. to find dishes hit by a stock-out)"""
+    try:
+        items_data = menu_snapshot.snapshot().containing(avatars.media_base(request), name)
+        return Response({'success': True, 'data': items_data})
+    except Exception as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 # ==================== ORDER MANAGEMENT ====================
 
 @api_view(['GET', 'POST'])
 def list_orders(request):
-    """List all orders or create a new order"""
+    """
+    List orders or create a new order.
+    GET supports status (comma-separated), order_type, since, fields, and
+    keyset pagination via limit/cursor (newest first).
+    """
     try:
         if request.method == 'GET':
-            orders = Order.objects.all().order_by('-createdAt')
+            try:
+                fields = parse_order_fields(request.GET.get('fields'))
+                limit = pagination.parse_limit(request.GET.get('limit'))
+                since = pagination.parse_since(request.GET.get('since'))
+            except ValueError as e:
+                return Response({
+                    'success': False,
+                    'error': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Apply filters
+            orders = Order.objects.all()
+            
+            # Apply filters (status accepts a comma-separated list)
             order_status = request.GET.get('status')
             order_type = request.GET.get('order_type')
             
             if order_status:
-                orders = orders.filter(orderStatus=order_status)
+                statuses = [value.strip() for value in order_status.split(',') if value.strip()]
+                orders = orders.filter(orderStatus__in=statuses)
             if order_type:
                 orders = orders.filter(orderType=order_type)
+            if since:
+                orders = orders.filter(updated_at__gt=since)
             
-            # Convert to dict
-            orders_data = []
-            for order in orders:
-                orders_data.append({
-                    'id': order.id,
-                    'fullName': order.fullName,
-                    'phoneNumber': order.phoneNumber,
-                    'address': order.address,
-                    'orderList': order.orderList,
-                    'totalFee': float(order.totalFee),
-                    'orderStatus': order.orderStatus,
-                    'orderType': order.orderType,
-                    'dayKey': order.dayKey,
-                    'createdAt': order.createdAt.isoformat() if order.createdAt else None,
-                })
+            # Project only the requested columns (plus the keyset columns)
+            columns = [ORDER_FIELD_COLUMNS.get(f, f) for f in fields]
+            columns += [c for c in ('id', 'createdAt') if c not in columns]
+            as_of = timezone.now()
             
-            return Response({
+            try:
+                rows, next_cursor = pagination.keyset_page(
+                    orders.values(*columns), limit, request.GET.get('cursor'))
+            except ValueError as e:
+                return Response({
+                    'success': False,
+                    'error': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            payload = {
                 'success': True,
-                'data': orders_data
-            })
+                'data': [serialize_order_row(row, fields) for row in rows]
+            }
+            if limit is not None:
+                payload['next_cursor'] = next_cursor
+            if since is not None:
+                # Pass back as ``since`` on the next incremental fetch
+                payload['as_of'] = as_of.isoformat()
+            return Response(payload)
         
         elif request.method == 'POST':
             data = request.data
@@ -700,17 +922,20 @@ def list_orders(request):
             
             now = datetime.now()
             
-            order = Order.objects.create(
-                id=order_id,
-                fullName=data.get('fullName', 'Unknown'),
-                phoneNumber=data.get('phoneNumber', ''),
-                address=data.get('address', ''),
-                orderList=data.get('orderList', []),
-                totalFee=data.get('totalFee', 0),
-                orderStatus=data.get('orderStatus', 'received'),
-                orderType=data.get('orderType', 'DINE_IN'),
-                dayKey=str(now.date()),
-            )
+            with transaction.atomic():
+                order = Order.objects.create(
+                    id=order_id,
+                    fullName=data.get('fullName', 'Unknown'),
+                    phoneNumber=data.get('phoneNumber', ''),
+                    address=data.get('address', ''),
+                    orderList=data.get('orderList', []),
+                    totalFee=data.get('totalFee', 0),
+                    orderStatus=data.get('orderStatus', 'received'),
+                    orderType=data.get('orderType', 'DINE_IN'),
+                    dayKey=now.strftime('%Y%m%d'),
+                )
+                sync_order_projections(None, order)
+                events.publish_order_event('order.created', order)
             
             return Response({
                 'success': True,
@@ -753,6 +978,7 @@ def order_detail(request, order_id):
         
         elif request.method == 'PUT':
             data = request.data
+            before = rollups.order_snapshot(order)
             
             if 'fullName' in data:
                 order.fullName = data['fullName']
@@ -769,7 +995,10 @@ def order_detail(request, order_id):
             if 'orderType' in data:
                 order.orderType = data['orderType']
             
-            order.save()
+            with transaction.atomic():
+                order.save()
+                sync_order_projections(before, order, items_changed='orderList' in data)
+                events.publish_order_event('order.updated', order)
             
             return Response({
                 'success': True,
@@ -793,8 +1022,12 @@ def update_order_status(request, order_id):
     """Update order status"""
     try:
         order = Order.objects.get(id=order_id)
+        before = rollups.order_snapshot(order)
         order.orderStatus = request.data.get('status', order.orderStatus)
-        order.save()
+        with transaction.atomic():
+            order.save()
+            sync_order_projections(before, order, items_changed=False)
+            events.publish_order_event('order.status', order)
         
         return Response({
             'success': True,
@@ -812,9 +1045,44 @@ def update_order_status(request, order_id):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def event_stream_response(request, bus):
+    """SSE response for ``bus``, replaying from Last-Event-ID when given"""
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('lastEventId')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    
+    response = StreamingHttpResponse(
+        events.stream(bus, last_event_id),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
+    return response
+
+
+async def order_events(request):
+    """
+    Server-sent event stream of order create/update/status changes.
+    Needs the ASGI application (core/asgi.py); honours Last-Event-ID for replay.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    return event_stream_response(request, events.order_events)
+
+
+async def menu_events(request):
+    """Server-sent event stream of menu changes (bulk availability toggles)"""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    return event_stream_response(request, events.menu_events)
+
+
 # ==================== CATEGORIES ====================
 
 @api_view(['GET', 'POST'])
+@cached_response('categories', ['categories'])
 def categories(request):
     """List or create categories"""
     try:
@@ -831,6 +1099,7 @@ def categories(request):
                 description=data.get('description', ''),
                 display_order=data.get('display_order', 0)
             )
+            invalidate_menu_caches()
             return Response({'success': True, 'data': {'id': cat.id, 'name': cat.name}})
     except Exception as e:
         return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -851,9 +1120,11 @@ def category_detail(request, category_id):
             if 'description' in data:
                 cat.description = data['description']
             cat.save()
+            invalidate_menu_caches()
             return Response({'success': True, 'message': 'Category updated'})
         elif request.method == 'DELETE':
             cat.delete()
+            invalidate_menu_caches()
             return Response({'success': True, 'message': 'Category deleted'})
     except Category.DoesNotExist:
         return Response({'success': False, 'error': 'Category not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -864,6 +1135,7 @@ def category_detail(request, category_id):
 # ==================== REPORTS & ANALYTICS ====================
 
 @api_view(['GET'])
+@cached_response('reports/sales', ['reports'])
 def sales_report(request):
     """Get sales report"""
     try:
@@ -882,50 +1154,39 @@ def sales_report(request):
 
 
 @api_view(['GET'])
+@cached_response('reports/popular-items', ['reports'])
 def popular_items_report(request):
-    """Get popular menu items"""
+    """Get popular menu items (optional limit, start_date, end_date)"""
     try:
-        # Count items from orders
-        item_counts = defaultdict(int)
-        item_revenue = defaultdict(float)
-        orders = Order.objects.all()
-        
-        for order in orders:
-            if isinstance(order.orderList, list):
-                for item in order.orderList:
-                    item_name = item.get('name', 'Unknown')
-                    quantity = item.get('quantity', 1)
-                    item_counts[item_name] += quantity
-                    item_revenue[item_name] += float(item.get('total', 0))
+        try:
+            start_key, end_key = parse_date_range(request)
+            limit = int(request.GET.get('limit', 10))
+        except ValueError as e:
+            return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Sort by count and get top 10
-        popular = sorted(item_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+        popular = line_items.popular_items(max(limit, 1), start_key, end_key)
         
         return Response({
             'success': True,
-            'data': [{
-                'name': name,
-                'count': count,
-                'revenue': float(item_revenue[name])
-            } for name, count in popular]
+            'data': popular
         })
     except Exception as e:
         return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 @api_view(['GET'])
+@cached_response('reports/revenue-trend', ['reports'])
 def revenue_trend(request):
     """Get revenue trend over time"""
     try:
-        # Last 30 days
-        trend = []
-        for i in range(30):
-            date = (datetime.now().date() - timedelta(days=i))
-            day_key = date.strftime('%Y%m%d')  # Format as YYYYMMDD
-            revenue = Order.objects.filter(dayKey=day_key).aggregate(Sum('totalFee'))['totalFee__sum'] or 0
-            trend.append({'date': date.strftime('%Y-%m-%d'), 'revenue': float(revenue)})
+        # Last 30 days from the daily rollup
+        dates = [datetime.now().date() - timedelta(days=i) for i in range(29, -1, -1)]
+        rows = rollups.daily_rows(dates)
         
-        trend.reverse()
+        trend = []
+        for date in dates:
+            row = rows.get(date.strftime('%Y%m%d'))  # Format as YYYYMMDD
+            trend.append({'date': date.strftime('%Y-%m-%d'), 'revenue': float(row.revenue) if row else 0.0})
         
         return Response({'success': True, 'data': trend})
     except Exception as e:
@@ -933,43 +1194,16 @@ def revenue_trend(request):
 
 
 @api_view(['GET'])
+@cached_response('reports/category-sales', ['reports'])
 def category_sales(request):
-    """Get sales by category"""
+    """Get sales by category (optional start_date, end_date)"""
     try:
-        category_totals = defaultdict(float)
-        category_orders = defaultdict(int)
-        orders = Order.objects.all()
-        
-        # Get menu items to map categories
-        menu_items_dict = {item.id: item for item in MenuItem.objects.all()}
-        
-        for order in orders:
-            if isinstance(order.orderList, list):
-                for item in order.orderList:
-                    item_id = item.get('id', '')
-                    menu_item = menu_items_dict.get(item_id)
-                    
-                    if menu_item:
-                        # Get category from menu item
-                        category_obj = Category.objects.filter(id=menu_item.category).first()
-                        category_name = category_obj.name if category_obj else 'Other'
-                    else:
-                        category_name = 'Other'
-                    
-                    price = float(item.get('price', 0))
-                    quantity = item.get('quantity', 1)
-                    category_totals[category_name] += price * quantity
-                    category_orders[category_name] += 1
+        try:
+            start_key, end_key = parse_date_range(request)
+        except ValueError as e:
+            return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        data = [
-            {
-                'category': cat,
-                'revenue': float(total),
-                'orders': category_orders[cat],
-                'growth': 0  # Placeholder for growth calculation
-            } 
-            for cat, total in category_totals.items()
-        ]
+        data = line_items.category_sales(start_key, end_key)
         
         return Response({'success': True, 'data': data})
     except Exception as e:
@@ -979,6 +1213,7 @@ def category_sales(request):
 # ==================== SETTINGS ====================
 
 @api_view(['GET', 'PUT'])
+@cached_response('settings', ['settings'])
 def settings(request):
     """Get or update settings"""
     try:
@@ -991,6 +1226,7 @@ def settings(request):
             data = request.data
             for key, value in data.items():
                 Setting.objects.update_or_create(key=key, defaults={'value': value})
+            response_cache.invalidate('settings')
             return Response({'success': True, 'message': 'Settings updated'})
     except Exception as e:
         return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -998,6 +1234,52 @@ def settings(request):
 
 # ==================== PROFILE ====================
 
+def profile_lookup(request, user_id, user_email):
+    """
+    (user_id, email, fallback_admin) a profile request refers to. A bearer
+    token decides on its own; otherwise the ID, then the email, then the
+    first admin for backward compatibility.
+    """
+    if request.user.is_authenticated:
+        return request.user.id, None, False
+    return user_id, profiles.normalize_email(user_email), True
+
+
+def legacy_identity_refused(request, user):
+    """
+    401 response if ``user`` was resolved from the legacy params (or the
+    admin fallback) although tokens were issued to them, else None
+    """
+    if user and not request.user.is_authenticated and tokens.token_required(user.id):
+        return Response({
+            'success': False,
+            'error': 'Sign in again to continue',
+            'code': 'token_not_valid'
+        }, status=status.HTTP_401_UNAUTHORIZED)
+    return None
+
+
+def find_profile_user(request, user_id, user_email):
+    """User a profile request refers to (one query, see profiles.resolve_user)"""
+    return profiles.resolve_user(*profile_lookup(request, user_id, user_email))
+
+
+def build_profile(user):
+    """Profile representation of a user (avatar left as a stored path)"""
+    return {
+        'id': user.id,
+        'name': user.fullName or user.name or 'User',
+        'email': user.email or '',
+        'phone': user.phoneNumber or user.phone or '',
+        'address': user.address or '',
+        'bio': user.bio or '',
+        'role': user.role or 'CUSTOMER',
+        'avatar': user.avatar or '',
+        'createdAt': user.createdAt.isoformat() if user.createdAt else '',
+        'lastLogin': user.lastLogin.isoformat() if user.lastLogin else '',
+    }
+
+
 @api_view(['GET', 'PUT'])
 def profile(request):
     """Get or update user profile (works for any role)"""
@@ -1007,31 +1289,13 @@ def profile(request):
             user_id = request.GET.get('userId')
             user_email = request.GET.get('email')
             
-            # Try to find user by ID first, then email, then fallback to first admin
-            user = None
-            if user_id:
-                user = User.objects.filter(id=user_id).first()
-            if not user and user_email:
-                user = User.objects.filter(email=user_email).first()
-            if not user:
-                # Fallback to first admin for backward compatibility
-                user = User.objects.filter(role__iexact='admin').first()
+            lookup = profile_lookup(request, user_id, user_email)
+            data = profiles.resolve_profile(*lookup[:2], build=build_profile, fallback_admin=lookup[2])
             
-            if user:
+            if data:
                 return Response({
                     'success': True,
-                    'data': {
-                        'id': user.id,
-                        'name': user.fullName or user.name or 'User',
-                        'email': user.email or '',
-                        'phone': user.phoneNumber or user.phone or '',
-                        'address': user.address or '',
-                        'bio': user.bio or '',
-                        'role': user.role or 'CUSTOMER',
-                        'avatar': user.avatar or '',
-                        'createdAt': user.createdAt.isoformat() if user.createdAt else '',
-                        'lastLogin': user.lastLogin.isoformat() if user.lastLogin else '',
-                    }
+                    'data': {**data, 'avatar': avatars.avatar_url(request, data['avatar']) or ''}
                 })
             else:
                 # Return default if no admin exists
@@ -1056,22 +1320,17 @@ def profile(request):
             user_id = data.get('userId')
             user_email = data.get('userEmail')
             
-            # Try to find user by ID first, then email, then fallback to first admin
-            user = None
-            if user_id:
-                user = User.objects.filter(id=user_id).first()
-            if not user and user_email:
-                user = User.objects.filter(email=user_email).first()
-            if not user:
-                # Fallback to first admin for backward compatibility
-                user = User.objects.filter(role__iexact='admin').first()
+            user = find_profile_user(request, user_id, user_email)
+            refused = legacy_identity_refused(request, user)
+            if refused:
+                return refused
             
             if user:
                 if 'name' in data:
                     user.fullName = data['name']
                     user.name = data['name']
                 if 'email' in data:
-                    user.email = data['email']
+                    user.email = profiles.normalize_email(data['email'])
                 if 'phone' in data:
                     user.phoneNumber = data['phone']
                     user.phone = data['phone']
@@ -1080,9 +1339,14 @@ def profile(request):
                 if 'bio' in data:
                     user.bio = data['bio']
                 if 'avatar' in data:
-                    user.avatar = data['avatar']
+                    try:
+                        user.avatar = avatars.store_avatar(data['avatar'])
+                    except ValueError as e:
+                        return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
                 
                 user.save()
+                auth.service.invalidate(user_id=user.id, email=user.email)
+                profiles.invalidate(user_id=user.id, email=user.email)
                 
                 return Response({'success': True, 'message': 'Profile updated successfully'})
             else:
@@ -1092,7 +1356,7 @@ def profile(request):
         return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-@api_view(['POST'])
+@api_view(['POST', 'PUT'])
 def change_password(request):
     """Change user password (works for any role)"""
     try:
@@ -1102,26 +1366,24 @@ def change_password(request):
         user_id = data.get('userId')
         user_email = data.get('userEmail')
         
-        # Try to find user by ID first, then email, then fallback to first admin
-        user = None
-        if user_id:
-            user = User.objects.filter(id=user_id).first()
-        if not user and user_email:
-            user = User.objects.filter(email=user_email).first()
-        if not user:
-            # Fallback to first admin for backward compatibility
-            user = User.objects.filter(role__iexact='admin').first()
+        user = find_profile_user(request, user_id, user_email)
+        refused = legacy_identity_refused(request, user)
+        if refused:
+            return refused
         
         if user:
             # Verify current password
-            current_hash = hashlib.sha256(current_password.encode()).hexdigest()
+            matches = not user.password_hash or passwords.verify_password(current_password, user.password_hash)[0]
             
-            if user.password_hash == current_hash or not user.password_hash:
+            if matches:
                 # Update password
-                user.password_hash = hashlib.sha256(new_password.encode()).hexdigest()
+                user.password_hash = passwords.hash_password(new_password)
                 user.save()
+                auth.service.invalidate(user_id=user.id)
+                # Sign out other sessions; the caller continues with a fresh pair
+                tokens.revocations.revoke_user(user.id)
                 
-                return Response({'success': True, 'message': 'Password changed successfully'})
+                return Response({'success': True, 'message': 'Password changed successfully', **tokens.issue_tokens(user)})
             else:
                 return Response({'success': False, 'error': 'Current password is incorrect'}, status=status.HTTP_400_BAD_REQUEST)
         else:
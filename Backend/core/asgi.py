@@ -3,6 +3,12 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve the project through this module (``uvicorn core.asgi:application``, as
+start-backend.bat does) so the long-lived event streams (/api/admin/events/*)
+run on the event loop. Under WSGI (``manage.py runserver``) each stream
+holds a worker thread and never delivers events. With DEBUG on, static files
+are served here as runserver would.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -14,3 +20,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402  (settings are configured above)
+
+if settings.DEBUG:
+    from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
+    application = ASGIStaticFilesHandler(application)
@@ -0,0 +1,307 @@
+"""
+Login fast path
+Keeps recently authenticated principals in an LRU, remembers unknown emails
+for a short TTL, and counts failed logins per account and per client IP in
+sliding windows so brute-force attempts are refused before touching the
+database. lastLogin and login_attempts are written behind the request in
+batches (see core/write_behind.py).
+
+State is per process; TTLs bound how long another worker can serve stale
+data, and write paths in this process call invalidate() directly.
+"""
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from core import passwords
+from core.write_behind import WriteBehindBuffer
+
+
+PRINCIPAL_FIELDS = ('id', 'fullName', 'name', 'email', 'phoneNumber', 'role', 'status', 'avatar', 'password_hash')
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class TTLCache:
+    """Thread-safe LRU with a per-entry time to live"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def discard_where(self, predicate):
+        with self._lock:
+            for key in [k for k, (_, v) in self._data.items() if predicate(k, v)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class SlidingWindowCounter:
+    """Counts events per key over the last ``window`` seconds"""
+
+    def __init__(self, window, maxkeys=100000):
+        self.window = window
+        self.maxkeys = maxkeys
+        self._events = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prune(self, key, now):
+        events = self._events.get(key)
+        if events is None:
+            return None
+        while events and events[0] <= now - self.window:
+            events.popleft()
+        if not events:
+            del self._events[key]
+            return None
+        return events
+
+    def add(self, key):
+        now = time.monotonic()
+        with self._lock:
+            events = self._prune(key, now)
+            if events is None:
+                events = self._events[key] = deque()
+            events.append(now)
+            self._events.move_to_end(key)
+            while len(self._events) > self.maxkeys:
+                self._events.popitem(last=False)
+            return len(events)
+
+    def blocked_for(self, key, limit):
+        """Seconds until ``key`` drops below ``limit`` events (0 if it already is)"""
+        now = time.monotonic()
+        with self._lock:
+            events = self._prune(key, now)
+            if events is None or len(events) < limit:
+                return 0
+            # The window must slide past the oldest event that keeps us at the limit
+            return max(1, int(events[len(events) - limit] + self.window - now) + 1)
+
+    def reset(self, key):
+        with self._lock:
+            self._events.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+
+
+@dataclass
+class LoginResult:
+    outcome: str  # 'ok', 'invalid', 'inactive' or 'locked'
+    principal: dict = None
+    retry_after: int = 0
+
+
+@dataclass
+class _CachedPrincipal:
+    principal: dict
+    verifier: bytes
+
+
+@dataclass
+class _LoginState:
+    last_login: object = None  # set by a successful login, which also resets the counter
+    failures: int = 0          # failures since then (or since the last flush)
+
+
+def merge_login_state(older, newer):
+    """Combine two queued states for a user, in the order they were recorded"""
+    if newer.last_login:
+        return newer  # a success resets the counter and supersedes older state
+    return _LoginState(older.last_login, older.failures + newer.failures)
+
+
+def write_login_state(entries):
+    """Write buffered login bookkeeping with one executemany per statement shape"""
+    adapt = connection.ops.adapt_datetimefield_value
+    logins = [
+        (adapt(state.last_login), adapt(state.last_login), state.failures, user_id)
+        for user_id, state in entries.items() if state.last_login
+    ]
+    failures = [
+        (state.failures, user_id)
+        for user_id, state in entries.items() if not state.last_login and state.failures
+    ]
+    with connection.cursor() as cursor:
+        if logins:
+            cursor.executemany(
+                'UPDATE users SET lastLogin = %s, updated_at = %s, login_attempts = %s WHERE id = %s',
+                logins,
+            )
+        if failures:
+            cursor.executemany(
+                'UPDATE users SET login_attempts = COALESCE(login_attempts, 0) + %s WHERE id = %s',
+                failures,
+            )
+
+
+class AuthService:
+    """Authenticates email/password logins, serving repeat logins from memory"""
+
+    def __init__(self):
+        self._key = os.urandom(32)  # verifiers never leave this process
+        self.configure()
+
+    def configure(self):
+        """(Re)build the caches from settings"""
+        self.principals = TTLCache(_setting('AUTH_PRINCIPAL_CACHE_SIZE', 1024), _setting('AUTH_PRINCIPAL_TTL', 300))
+        self.unknown = TTLCache(_setting('AUTH_NEGATIVE_CACHE_SIZE', 4096), _setting('AUTH_NEGATIVE_TTL', 60))
+        window = _setting('LOGIN_FAILURE_WINDOW', 900)
+        self.account_failures = SlidingWindowCounter(window)
+        self.ip_failures = SlidingWindowCounter(window)
+        self.login_writes = WriteBehindBuffer(
+            'login-state', write_login_state,
+            interval=_setting('LOGIN_WRITE_BEHIND_SECONDS', 5),
+            max_entries=_setting('LOGIN_WRITE_BEHIND_BATCH', 200),
+            merge=merge_login_state,
+        )
+
+    def _verifier(self, email, password):
+        return hmac.new(self._key, f'{email}\0{password}'.encode(), hashlib.sha256).digest()
+
+    # -- fast path (memory only) --
+
+    def check(self, email, password, ip):
+        """Answer from memory if possible; None means the database must be consulted"""
+        retry_after = max(
+            self.account_failures.blocked_for(email, _setting('LOGIN_MAX_ACCOUNT_FAILURES', 5)),
+            self.ip_failures.blocked_for(ip, _setting('LOGIN_MAX_IP_FAILURES', 50)),
+        )
+        if retry_after:
+            return LoginResult('locked', retry_after=retry_after)
+
+        if self.unknown.get(email):
+            self.ip_failures.add(ip)
+            return LoginResult('invalid')
+
+        cached = self.principals.get(email)
+        if cached and hmac.compare_digest(cached.verifier, self._verifier(email, password)):
+            return self._succeeded(cached.principal, email)
+        return None
+
+    # -- slow path --
+
+    def load(self, email):
+        """Fetch the login columns of a user by email"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {', '.join(PRINCIPAL_FIELDS)} FROM users WHERE email = %s",
+                [email],
+            )
+            row = cursor.fetchone()
+        return dict(zip(PRINCIPAL_FIELDS, row)) if row else None
+
+    def complete(self, email, password, ip, row, matches, new_hash):
+        """Record the outcome of a database lookup plus password check"""
+        if row is None:
+            self.unknown.set(email, True)
+            self.ip_failures.add(ip)
+            return LoginResult('invalid')
+
+        if not matches:
+            self.account_failures.add(email)
+            self.ip_failures.add(ip)
+            self._record_failure(row['id'])
+            return LoginResult('invalid')
+
+        if new_hash:
+            # Legacy or outdated hash: store it with the current hasher
+            with connection.cursor() as cursor:
+                cursor.execute('UPDATE users SET password_hash = %s WHERE id = %s', [new_hash, row['id']])
+
+        principal = {k: v for k, v in row.items() if k != 'password_hash'}
+        self.principals.set(email, _CachedPrincipal(principal, self._verifier(email, password)))
+        return self._succeeded(principal, email)
+
+    def _succeeded(self, principal, email):
+        self.account_failures.reset(email)
+        if (principal['status'] or '').lower() != 'active':
+            return LoginResult('inactive', principal)
+        # Replaces any queued failures: a successful login resets login_attempts
+        now = timezone.now()
+        self.login_writes.update(principal['id'], lambda _: _LoginState(last_login=now))
+        return LoginResult('ok', principal)
+
+    def authenticate(self, email, password, ip):
+        result = self.check(email, password, ip)
+        if result:
+            return result
+        row = self.load(email)
+        matches, new_hash = passwords.verify_password(password, row['password_hash'] if row else None)
+        return self.complete(email, password, ip, row, matches, new_hash)
+
+    async def aauthenticate(self, email, password, ip):
+        result = self.check(email, password, ip)
+        if result:
+            return result
+        row = await sync_to_async(self.load)(email)
+        matches, new_hash = await passwords.averify_password(password, row['password_hash'] if row else None)
+        return await sync_to_async(self.complete)(email, password, ip, row, matches, new_hash)
+
+    # -- login bookkeeping --
+
+    def _record_failure(self, user_id):
+        def add_failure(state):
+            state = state or _LoginState()
+            return _LoginState(state.last_login, state.failures + 1)
+        self.login_writes.update(user_id, add_failure)
+
+    # -- invalidation --
+
+    def invalidate(self, user_id=None, email=None):
+        """Forget cached state for a user whose row changed (or every user if no args)"""
+        if user_id is None and email is None:
+            self.principals.clear()
+            self.unknown.clear()
+            return
+        if email:
+            self.principals.pop(email)
+            self.unknown.pop(email)
+        if user_id is not None:
+            self.principals.discard_where(lambda _, cached: cached.principal['id'] == user_id)
+
+
+service = AuthService()
+
+
+def client_ip(request):
+    return request.META.get('REMOTE_ADDR') or 'unknown'
@@ -0,0 +1,52 @@
+"""
+SQLite tuning
+Applies the PRAGMAs from settings.SQLITE_PRAGMAS to every new SQLite
+connection and reports the values actually in effect (manage.py
+sqlite_status). There is deliberately no system check: checks run on
+every manage command, and opening a connection applies the PRAGMAs,
+which rewrites the database file (journal_mode=WAL).
+"""
+import re
+from django.conf import settings
+from django.db import connections
+
+
+_SAFE_VALUE = re.compile(r'^-?[A-Za-z0-9_]+$')
+
+
+def configured_pragmas():
+    return getattr(settings, 'SQLITE_PRAGMAS', {}) or {}
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """connection_created handler: apply configured PRAGMAs to SQLite connections"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in configured_pragmas().items():
+            value = str(value)
+            if not _SAFE_VALUE.match(name) or not _SAFE_VALUE.match(value):
+                raise ValueError(f'Invalid SQLite PRAGMA {name}={value}')
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def pragma_report(alias='default'):
+    """Return {pragma: (configured, in effect)} for a SQLite connection alias"""
+    connection = connections[alias]
+    report = {}
+    with connection.cursor() as cursor:
+        for name, value in configured_pragmas().items():
+            cursor.execute(f'PRAGMA {name}')
+            row = cursor.fetchone()
+            report[name] = (value, row[0] if row else None)
+    return report
+
+
+def pragma_matches(configured, actual):
+    """Compare a configured PRAGMA value with what SQLite reports"""
+    if str(configured).lower() == str(actual).lower():
+        return True
+    # synchronous and temp_store report numeric codes
+    codes = {'off': '0', 'normal': '1', 'full': '2', 'extra': '3', 'default': '0', 'file': '1', 'memory': '2'}
+    return codes.get(str(configured).lower()) == str(actual)
+
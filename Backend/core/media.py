@@ -0,0 +1,179 @@
+"""
+Media storage and serving
+Menu uploads are stored under content-hash names (``<stem>.<sha256[:16]><ext>``),
+so a URL never changes meaning: re-uploading different bytes yields a new
+name, identical bytes reuse the stored file. Content-hashed paths (these,
+their derivatives and the SHA-256 named avatars) are served with
+``Cache-Control: immutable``; anything else must be revalidated. Every file
+gets a strong ETag and Last-Modified and honours If-None-Match and
+single-range ``Range`` requests.
+
+Full responses are FileResponses, which WSGI servers with a
+``wsgi.file_wrapper`` send with sendfile(). With MEDIA_ACCEL_REDIRECT set
+(an internal nginx location mapped to MEDIA_ROOT) the body, ranges
+included, is left to the front-end server entirely.
+"""
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date
+
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, no-cache'
+CHUNK_SIZE = 64 * 1024
+
+_DIGEST_SUFFIX_RE = re.compile(r'\.[0-9a-f]{16}$')
+# <stem>.<16 hex>.<ext> files and <stem>.<16 hex>/ derivative folders, or <64 hex>[_size].<ext> avatars
+_CONTENT_HASHED_RE = re.compile(r'(?:\.[0-9a-f]{16}(?:\.\w+$|/)|(?:^|/)[0-9a-f]{64}(?:_\d+)?\.\w+$)')
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class HashedFileSystemStorage(FileSystemStorage):
+    """FileSystemStorage that names files by their content hash"""
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        directory, filename = posixpath.split(name)
+        stem, extension = posixpath.splitext(filename)
+        stem = _DIGEST_SUFFIX_RE.sub('', stem)  # re-hashing replaces the old digest
+        return posixpath.join(directory, f'{stem}.{digest.hexdigest()[:16]}{extension}')
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            return name  # same bytes already stored
+        return super().save(name, content, max_length=max_length)
+
+
+_hashed_storage = None
+
+
+def hashed_storage():
+    """Storage for FileFields whose files should get content-hash names"""
+    global _hashed_storage
+    if _hashed_storage is None:
+        _hashed_storage = HashedFileSystemStorage()
+    return _hashed_storage
+
+
+def is_content_hashed(path):
+    return bool(_CONTENT_HASHED_RE.search(path))
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single ``bytes=`` range, or None to send the
+    whole file (no, malformed or multi-part range). Raises ValueError if the
+    range cannot be satisfied.
+    """
+    match = _RANGE_RE.match((header or '').strip())
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+    else:
+        suffix = int(last)
+        if suffix == 0:
+            raise ValueError('empty suffix range')
+        start, end = max(0, size - suffix), size - 1
+    if start >= size:
+        raise ValueError('range starts past the end of the file')
+    return start, end
+
+
+def _matches(header, etag):
+    candidates = [value.strip() for value in header.split(',')]
+    return '*' in candidates or etag in candidates or f'W/{etag}' in candidates
+
+
+def _read_range(path, start, end):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def serve(request, path):
+    """Serve a file from MEDIA_ROOT with caching, conditional and range support"""
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponse(status=405, headers={'Allow': 'GET, HEAD'})
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('Not found')
+    try:
+        stat = os.stat(fullpath)
+    except OSError:
+        raise Http404('Not found')
+    if not os.path.isfile(fullpath):
+        raise Http404('Not found')
+
+    size = stat.st_size
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': IMMUTABLE_CACHE_CONTROL if is_content_hashed(path) else REVALIDATE_CACHE_CONTROL,
+        'Accept-Ranges': 'bytes',
+    }
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match and _matches(if_none_match, etag):
+        response = HttpResponseNotModified()
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    content_type = content_type or 'application/octet-stream'
+
+    accel = getattr(settings, 'MEDIA_ACCEL_REDIRECT', '')
+    if accel:
+        # nginx serves the body (sendfile, ranges) from its internal location
+        response = HttpResponse(content_type=content_type, headers=headers)
+        response['X-Accel-Redirect'] = f"{accel.rstrip('/')}/{path.lstrip('/')}"
+        return response
+
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if request.headers.get('Range') and (not if_range or if_range == etag):
+        try:
+            byte_range = parse_range(request.headers['Range'], size)
+        except ValueError:
+            return HttpResponse(status=416, headers={**headers, 'Content-Range': f'bytes */{size}'})
+
+    if byte_range is None:
+        response = FileResponse(open(fullpath, 'rb'), content_type=content_type, headers=headers)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(_read_range(fullpath, start, end), status=206,
+                                         content_type=content_type, headers=headers)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return response
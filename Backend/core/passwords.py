@@ -0,0 +1,137 @@
+"""
+Password hashing
+Wraps Django's hashers (settings.PASSWORD_HASHERS, PBKDF2 or scrypt first)
+and runs every hash/verify on a bounded worker pool so a burst of logins
+cannot occupy every request thread or the ASGI event loop. Legacy unsalted
+SHA-256 hex digests still verify and are upgraded on the next login.
+"""
+import asyncio
+import hashlib
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import BasePasswordHasher, check_password, make_password
+from django.utils.crypto import constant_time_compare
+
+
+_LEGACY_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+class LegacySHA256PasswordHasher(BasePasswordHasher):
+    """Verifies the unsalted sha256(password) hex digests stored before hashing was upgraded"""
+    algorithm = 'sha256_legacy'
+
+    def salt(self):
+        return ''
+
+    def encode(self, password, salt):
+        return f'{self.algorithm}$${hashlib.sha256(password.encode()).hexdigest()}'
+
+    def decode(self, encoded):
+        algorithm, _, digest = encoded.split('$', 2)
+        return {'algorithm': algorithm, 'hash': digest, 'salt': ''}
+
+    def verify(self, password, encoded):
+        return constant_time_compare(encoded, self.encode(password, ''))
+
+    def safe_summary(self, encoded):
+        return {'algorithm': self.algorithm, 'hash': self.decode(encoded)['hash'][:6] + '...'}
+
+    def must_update(self, encoded):
+        return True
+
+    def harden_runtime(self, password, encoded):
+        pass
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing queue is full; callers should answer 503"""
+
+
+_pool = None
+_slots = None
+_bulk_slots = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    global _pool, _slots, _bulk_slots
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                workers = settings.PASSWORD_HASH_WORKERS
+                _slots = threading.BoundedSemaphore(workers + settings.PASSWORD_HASH_QUEUE)
+                # Bulk hashing may hold at most half the workers' slots; the rest
+                # of the workers and the whole queue stay free for logins
+                _bulk_slots = threading.BoundedSemaphore(max(1, workers // 2))
+                _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+    return _pool
+
+
+def _submit(fn, *args):
+    pool = _executor()
+    if not _slots.acquire(blocking=False):
+        raise HashingBusy('Too many logins in progress, please retry')
+    future = pool.submit(fn, *args)
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+def _normalize(encoded):
+    # Bare hex digests predate the algorithm$... format
+    if encoded and _LEGACY_RE.match(encoded):
+        return f'{LegacySHA256PasswordHasher.algorithm}$${encoded}'
+    return encoded
+
+
+def _verify(password, encoded):
+    upgraded = []
+    if not encoded:
+        # Same work as a real check so unknown accounts are not distinguishable by timing
+        make_password(password)
+        return False, None
+    ok = check_password(password, _normalize(encoded), setter=lambda raw: upgraded.append(make_password(raw)))
+    return ok, (upgraded[0] if ok and upgraded else None)
+
+
+def hash_password(password):
+    """Hash a new password with the preferred hasher"""
+    return _submit(make_password, password).result()
+
+
+def hash_passwords(values):
+    """
+    Hash many passwords on the pool (bulk imports). Waits for free slots
+    instead of raising HashingBusy, and never has more than half the
+    workers' hashes in flight, so concurrent logins are not starved.
+    """
+    pool = _executor()
+    futures = []
+    for value in values:
+        _bulk_slots.acquire()
+        _slots.acquire()
+        future = pool.submit(make_password, value)
+        future.add_done_callback(_release_bulk)
+        futures.append(future)
+    return [future.result() for future in futures]
+
+
+def _release_bulk(_):
+    _slots.release()
+    _bulk_slots.release()
+
+
+def verify_password(password, encoded):
+    """
+    Check a password against a stored hash.
+    Returns (matches, new_hash); new_hash is set when the stored hash uses a
+    legacy algorithm or outdated parameters and should be saved in its place.
+    Pass encoded=None for unknown accounts to keep timing uniform.
+    """
+    return _submit(_verify, password, encoded).result()
+
+
+async def averify_password(password, encoded):
+    """verify_password for async views; awaits the pool without blocking the loop"""
+    return await asyncio.wrap_future(_submit(_verify, password, encoded))
@@ -11,8 +11,11 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 # backend/core/settings.py
+import hashlib
 import os
+from datetime import timedelta
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -70,9 +73,27 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections open between requests (seconds; 0 = per request)
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Take the write lock at BEGIN so the busy timeout applies instead of failing mid-transaction
+            'transaction_mode': os.getenv('SQLITE_TRANSACTION_MODE', 'IMMEDIATE'),
+            # Seconds to wait for a lock (the connection's busy timeout)
+            'timeout': float(os.getenv('SQLITE_TIMEOUT', '5')),
+        },
     }
 }
 
+# Applied to every new SQLite connection (see core/db.py)
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', '-20000')),  # negative = KiB
+    'temp_store': os.getenv('SQLITE_TEMP_STORE', 'MEMORY'),
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -155,15 +176,31 @@ MEDIA_ROOT = BASE_DIR.parent / 'mediafiles'
 
 # REST Framework
 REST_FRAMEWORK = {
-    # Disable authentication for now - TODO: Add JWT authentication later
-    # 'DEFAULT_AUTHENTICATION_CLASSES': [
-    #     'rest_framework_simplejwt.authentication.JWTAuthentication',
-    # ],
+    # Bearer JWTs identify the caller from their claims, without a user lookup (core/tokens.py)
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'core.tokens.TokenAuthentication',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',  # Changed from IsAuthenticatedOrReadOnly
     ],
 }
 
+# JWT sessions issued at login (claims: user_id, role, email)
+# JWT signing key (HS256 wants at least 32 bytes). Without JWT_SIGNING_KEY it
+# is derived from SECRET_KEY, which is only as strong as SECRET_KEY itself.
+JWT_SIGNING_KEY = os.getenv('JWT_SIGNING_KEY') or hashlib.sha256(f'jwt:{SECRET_KEY}'.encode()).hexdigest()
+if len(JWT_SIGNING_KEY.encode()) < 32:
+    raise ImproperlyConfigured('JWT_SIGNING_KEY must be at least 32 bytes')
+
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=int(os.getenv('JWT_ACCESS_MINUTES', '30'))),
+    'REFRESH_TOKEN_LIFETIME': timedelta(days=int(os.getenv('JWT_REFRESH_DAYS', '7'))),
+    'SIGNING_KEY': JWT_SIGNING_KEY,
+    'USER_ID_FIELD': 'id',
+    'USER_ID_CLAIM': 'user_id',
+    'UPDATE_LAST_LOGIN': False,
+}
+
 # drf-yasg (Swagger)
 SWAGGER_SETTINGS = {
     'SECURITY_DEFINITIONS': {
@@ -174,3 +211,64 @@ SWAGGER_SETTINGS = {
         }
     },
 }
+
+# ID allocation: reserve IDs from the sequence table in blocks of this size
+# (1 = one atomic increment per insert; larger blocks may leave gaps on restart)
+ID_BLOCK_SIZE = int(os.getenv('ID_BLOCK_SIZE', '1'))
+
+# Password hashing (see core/passwords.py): PASSWORD_HASHER=pbkdf2|scrypt picks
+# the hasher for new and upgraded hashes; the others still verify
+_PASSWORD_HASHERS = {
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+}
+_preferred_hasher = _PASSWORD_HASHERS[os.getenv('PASSWORD_HASHER', 'pbkdf2')]
+PASSWORD_HASHERS = [_preferred_hasher] + [
+    hasher for hasher in _PASSWORD_HASHERS.values() if hasher != _preferred_hasher
+] + ['core.passwords.LegacySHA256PasswordHasher']
+# Worker threads for hashing and how many more requests may wait before logins get a 503
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 2)))
+PASSWORD_HASH_QUEUE = int(os.getenv('PASSWORD_HASH_QUEUE', '64'))
+
+# Login fast path (see core/auth.py): cached principals, unknown-email TTL,
+# sliding-window lockouts; lastLogin/login_attempts are written behind in batches
+AUTH_PRINCIPAL_CACHE_SIZE = int(os.getenv('AUTH_PRINCIPAL_CACHE_SIZE', '1024'))
+AUTH_PRINCIPAL_TTL = int(os.getenv('AUTH_PRINCIPAL_TTL', '300'))
+AUTH_NEGATIVE_CACHE_SIZE = int(os.getenv('AUTH_NEGATIVE_CACHE_SIZE', '4096'))
+AUTH_NEGATIVE_TTL = int(os.getenv('AUTH_NEGATIVE_TTL', '60'))
+LOGIN_FAILURE_WINDOW = int(os.getenv('LOGIN_FAILURE_WINDOW', '900'))
+LOGIN_MAX_ACCOUNT_FAILURES = int(os.getenv('LOGIN_MAX_ACCOUNT_FAILURES', '5'))
+LOGIN_MAX_IP_FAILURES = int(os.getenv('LOGIN_MAX_IP_FAILURES', '50'))
+LOGIN_WRITE_BEHIND_SECONDS = float(os.getenv('LOGIN_WRITE_BEHIND_SECONDS', '5'))
+LOGIN_WRITE_BEHIND_BATCH = int(os.getenv('LOGIN_WRITE_BEHIND_BATCH', '200'))
+
+# Resolved profiles cached per process (see admin_api/profiles.py)
+PROFILE_CACHE_SIZE = int(os.getenv('PROFILE_CACHE_SIZE', '1024'))
+PROFILE_CACHE_TTL = int(os.getenv('PROFILE_CACHE_TTL', '300'))
+
+# Threads rendering menu image derivatives (see admin_api/menu_images.py); 0 renders inline
+MENU_IMAGE_WORKERS = int(os.getenv('MENU_IMAGE_WORKERS', '2'))
+
+# Media is served by core/media.py; set to an internal nginx location aliased to
+# MEDIA_ROOT (e.g. /protected-media/) to hand file bodies to nginx via X-Accel-Redirect
+MEDIA_ACCEL_REDIRECT = os.getenv('MEDIA_ACCEL_REDIRECT', '')
+
+# Cache (local memory by default; CACHE_BACKEND=file shares it between worker processes)
+if os.getenv('CACHE_BACKEND', 'locmem') == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / 'cache')),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'resto-default',
+        }
+    }
+
+# Cached admin API responses (see admin_api/response_cache.py)
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', '300'))
@@ -0,0 +1,79 @@
+"""
+Tests for core helpers
+Run with: python manage.py test core.tests
+"""
+import contextlib
+import threading
+import time
+from unittest import mock
+from django.test import SimpleTestCase, override_settings
+from core import auth, passwords
+from core.write_behind import WriteBehindBuffer
+
+
+def _slow_make_password(password, *args, **kwargs):
+    time.sleep(0.01)
+    return f'hashed${password}'
+
+
+@override_settings(PASSWORD_HASH_WORKERS=2, PASSWORD_HASH_QUEUE=8)
+class PasswordPoolTests(SimpleTestCase):
+    def setUp(self):
+        self._reset_pool()
+        self.addCleanup(self._reset_pool)
+
+    def _reset_pool(self):
+        if passwords._pool is not None:
+            passwords._pool.shutdown(wait=True)
+        passwords._pool = passwords._slots = passwords._bulk_slots = None
+
+    @mock.patch('core.passwords.make_password', _slow_make_password)
+    def test_logins_are_not_starved_by_bulk_hashing(self):
+        results = []
+        bulk = threading.Thread(target=lambda: results.extend(passwords.hash_passwords([f'pw{i}' for i in range(80)])))
+        bulk.start()
+        time.sleep(0.05)  # let the import fill its share of the pool
+
+        busy = 0
+        for _ in range(20):
+            try:
+                self.assertEqual(passwords.verify_password('secret', None), (False, None))
+            except passwords.HashingBusy:
+                busy += 1
+        bulk.join()
+
+        self.assertEqual(busy, 0)
+        self.assertEqual(results, [f'hashed$pw{i}' for i in range(80)])
+
+    @mock.patch('core.passwords.make_password', _slow_make_password)
+    def test_bulk_hashing_leaves_login_slots_free(self):
+        passwords._executor()
+        # One of two workers may be used by bulk hashing at a time
+        self.assertTrue(passwords._bulk_slots.acquire(blocking=False))
+        self.assertFalse(passwords._bulk_slots.acquire(blocking=False))
+        passwords._bulk_slots.release()
+
+
+@mock.patch('core.write_behind.transaction.atomic', contextlib.nullcontext)
+class LoginWriteBehindTests(SimpleTestCase):
+    def _failing_buffer(self):
+        def write(entries):
+            buffer.update('u1', lambda state: auth.merge_login_state(state or auth._LoginState(), auth._LoginState(failures=1)))
+            raise RuntimeError('database is locked')
+        buffer = WriteBehindBuffer('test', write, merge=auth.merge_login_state)
+        buffer._ensure_thread = lambda: None
+        return buffer
+
+    def test_failed_flush_keeps_failures_queued_meanwhile(self):
+        buffer = self._failing_buffer()
+        buffer.update('u1', lambda _: auth._LoginState(failures=2))
+        with self.assertRaises(RuntimeError):
+            buffer.flush()
+        self.assertEqual(buffer.pending(), {'u1': auth._LoginState(failures=3)})
+
+    def test_success_supersedes_earlier_failures(self):
+        now = object()
+        merged = auth.merge_login_state(auth._LoginState(failures=4), auth._LoginState(last_login=now))
+        self.assertEqual(merged, auth._LoginState(last_login=now))
+        merged = auth.merge_login_state(auth._LoginState(last_login=now), auth._LoginState(failures=2))
+        self.assertEqual(merged, auth._LoginState(last_login=now, failures=2))
@@ -0,0 +1,150 @@
+"""
+JWT sessions
+Login responses carry an access/refresh token pair whose claims hold the
+user's id, role and email, so API calls identify the caller by checking the
+signature locally instead of re-reading the users table. Logout and
+credential changes are honoured through an in-memory revocation list.
+
+Requests without a token may still name a user through the legacy
+userId/email params, except for users issued tokens within the refresh
+lifetime (token_required): otherwise dropping or revoking a token would
+simply fall back to the legacy params.
+
+The revocation list and issued-token record are per process: run a single
+worker process, or keep ACCESS_TOKEN_LIFETIME short enough that other
+workers' windows are acceptable.
+"""
+import threading
+import time
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken, UntypedToken
+
+
+class RevocationList:
+    """
+    Revoked token ids plus per-user "not before" times, and the users issued
+    tokens recently, all pruned as tokens expire
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = {}  # jti -> exp
+        self._users = {}   # user id -> (not_before, forget_after)
+        self._issued = {}  # user id -> forget_after
+
+    def _prune(self, now):
+        self._tokens = {jti: exp for jti, exp in self._tokens.items() if exp > now}
+        self._users = {uid: entry for uid, entry in self._users.items() if entry[1] > now}
+        self._issued = {uid: forget_after for uid, forget_after in self._issued.items() if forget_after > now}
+
+    def record_issued(self, user_id):
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            self._issued[str(user_id)] = now + api_settings.REFRESH_TOKEN_LIFETIME.total_seconds()
+
+    def was_issued(self, user_id):
+        with self._lock:
+            return self._issued.get(str(user_id), 0) > time.time()
+
+    def revoke_token(self, token):
+        with self._lock:
+            now = time.time()
+            self._prune(now)
+            self._tokens[token['jti']] = token['exp']
+
+    def revoke_user(self, user_id):
+        """Revoke every token issued to a user before now"""
+        now = time.time()
+        forget_after = now + api_settings.REFRESH_TOKEN_LIFETIME.total_seconds()
+        with self._lock:
+            self._prune(now)
+            self._users[str(user_id)] = (int(now), forget_after)
+
+    def is_revoked(self, token):
+        jti = token.get('jti')
+        user_id = token.get(api_settings.USER_ID_CLAIM)
+        with self._lock:
+            if jti in self._tokens:
+                return True
+            entry = self._users.get(str(user_id))
+        return entry is not None and token.get('iat', 0) < entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+            self._users.clear()
+            self._issued.clear()
+
+
+revocations = RevocationList()
+
+
+def issue_tokens(principal):
+    """Access/refresh pair for a user dict or model instance with id, role and email"""
+    get = principal.get if isinstance(principal, dict) else lambda name: getattr(principal, name)
+    refresh = RefreshToken()
+    refresh[api_settings.USER_ID_CLAIM] = get('id')
+    refresh['role'] = get('role')
+    refresh['email'] = get('email')
+    revocations.record_issued(get('id'))
+    # The access token copies the custom claims
+    return {'access': str(refresh.access_token), 'refresh': str(refresh)}
+
+
+class TokenAuthentication(JWTStatelessUserAuthentication):
+    """Bearer-token authentication without a user lookup; rejects revoked tokens"""
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if revocations.is_revoked(token):
+            raise InvalidToken({'detail': 'Token has been revoked', 'code': 'token_not_valid'})
+        return token
+
+
+def request_caller(request):
+    """
+    TokenUser for a request's bearer token (``caller.token['role']`` etc.),
+    or None without one. Raises AuthenticationFailed for invalid tokens.
+    For plain Django views; DRF views get the same object as request.user.
+    """
+    result = TokenAuthentication().authenticate(request)
+    return result[0] if result else None
+
+
+def token_required(user_id):
+    """
+    True if a request without a token must not act for ``user_id`` through
+    the legacy params: the user has been issued tokens (which may since have
+    been revoked) that are not yet expired
+    """
+    return revocations.was_issued(user_id)
+
+
+def revoke_presented(request, refresh=None):
+    """Revoke the request's access token and an optional refresh token"""
+    try:
+        result = TokenAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        result = None  # expired or already revoked
+    if result:
+        revocations.revoke_token(result[1])
+    if refresh:
+        try:
+            revocations.revoke_token(UntypedToken(refresh))
+        except TokenError:
+            pass
+
+
+class RevocationAwareRefreshSerializer(TokenRefreshSerializer):
+    """Refreshes from the token's claims alone (users are not django.contrib.auth users)"""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if revocations.is_revoked(refresh):
+            raise AuthenticationFailed('Token has been revoked', 'token_not_valid')
+        return {'access': str(refresh.access_token)}
@@ -0,0 +1,104 @@
+"""
+Write-behind buffer
+Coalesces per-key updates in memory and writes them in one transaction
+from a background thread every ``interval`` seconds, as soon as
+``max_entries`` keys are pending, and once more at interpreter shutdown.
+Used for bookkeeping columns (lastLogin, login_attempts) whose writes
+would otherwise take the SQLite write lock on the request path.
+"""
+import atexit
+import logging
+import threading
+from django.db import close_old_connections, transaction
+
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """
+    ``write(entries)`` receives {key: value} and performs the batched writes;
+    it runs inside transaction.atomic(). Values are combined with
+    ``update(key, fn)`` where fn(previous value or None) returns the new one.
+    When a flush fails, ``merge(failed, newer)`` combines each value of the
+    failed batch with anything queued for the key since (default: keep the
+    newer value).
+    """
+
+    def __init__(self, name, write, interval=5, max_entries=200, merge=None):
+        self.name = name
+        self.write = write
+        self.merge = merge or (lambda failed, newer: newer)
+        self.interval = interval
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        self._wake = threading.Event()
+        self._thread = None
+        self._stopped = False
+
+    def update(self, key, fn):
+        with self._lock:
+            self._pending[key] = fn(self._pending.get(key))
+            full = len(self._pending) >= self.max_entries
+        self._ensure_thread()
+        if full:
+            self._wake.set()
+
+    def discard(self, key):
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def pending(self):
+        with self._lock:
+            return dict(self._pending)
+
+    def flush(self):
+        """Write everything pending now; returns the number of keys written"""
+        with self._flush_lock:
+            with self._lock:
+                entries, self._pending = self._pending, {}
+            if not entries:
+                return 0
+            try:
+                with transaction.atomic():
+                    self.write(entries)
+            except Exception:
+                # Put the batch back, combined with newer updates, and retry next round
+                with self._lock:
+                    for key, value in entries.items():
+                        if key in self._pending:
+                            value = self.merge(value, self._pending[key])
+                        self._pending[key] = value
+                raise
+            return len(entries)
+
+    def _ensure_thread(self):
+        if self._thread is not None or self._stopped:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f'write-behind-{self.name}', daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('write-behind %s flush failed', self.name)
+            finally:
+                close_old_connections()
+
+    def stop(self):
+        """Flush what is left and stop the background thread"""
+        self._stopped = True
+        self._wake.set()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('write-behind %s final flush failed', self.name)
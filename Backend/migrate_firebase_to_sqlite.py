@@ -10,6 +10,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 django.setup()
 
 from admin_api.models import User, MenuItem, Order, Category
+from admin_api.rollups import normalize_day_key
 from utils.firebase_config import db, COLLECTIONS
 from datetime import datetime
 from decimal import Decimal
@@ -153,7 +154,7 @@ for order_doc in firebase_orders:
                 'totalFee': Decimal(str(order_data.get('totalFee', 0))),
                 'orderStatus': order_data.get('orderStatus', 'received'),
                 'orderType': order_data.get('orderType', 'DINE_IN'),
-                'dayKey': order_data.get('dayKey', created_at.strftime('%Y-%m-%d')),
+                'dayKey': normalize_day_key(order_data.get('dayKey') or created_at.strftime('%Y%m%d')),
                 'createdAt': created_at,
             }
         )
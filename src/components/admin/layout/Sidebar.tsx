@@ -18,7 +18,7 @@ import { useAdmin } from "../../../contexts/AdminContext";
 import { BRANDING } from "../../../constants/branding";
 import { THEME } from "../../../constants/theme";
 import { Avatar } from "../../common/Avatar";
-import { dashboardApi } from "../../../services/apiservice";
+import { dashboardApi, ordersApi } from "../../../services/apiservice";
 
 interface MenuItem {
   path: string;
@@ -76,14 +76,18 @@ export const Sidebar: React.FC = () => {
 
   useEffect(() => {
     fetchBadgeCounts();
-    // Refresh every 30 seconds
+    // Refresh when an order changes; keep the 30s poll in case the stream is down
+    const source = ordersApi.subscribe(() => fetchBadgeCounts());
     const interval = setInterval(fetchBadgeCounts, 30000);
-    return () => clearInterval(interval);
+    return () => {
+      source.close();
+      clearInterval(interval);
+    };
   }, []);
 
   const fetchBadgeCounts = async () => {
     try {
-      const response = await dashboardApi.getStats();
+      const response = await dashboardApi.getStats(['pending_orders']);
       if (response.success) {
         setBadges({
           pending_orders: response.data.pending_orders || 0
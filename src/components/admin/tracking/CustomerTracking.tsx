@@ -14,19 +14,26 @@ export const CustomerTracking: React.FC = () => {
 
   useEffect(() => {
     fetchTrackingData();
-    // Refresh every 10 seconds for real-time updates
+    // Refresh when the server pushes an order change; keep the 10s poll in case the stream is down
+    const source = ordersApi.subscribe(() => fetchTrackingData());
     const interval = setInterval(fetchTrackingData, 10000);
-    return () => clearInterval(interval);
+    return () => {
+      source.close();
+      clearInterval(interval);
+    };
   }, []);
 
   const fetchTrackingData = async () => {
     try {
       setError(null);
-      const response = await ordersApi.getAll();
+      // Only active orders, without the orderList payload
+      const response = await ordersApi.getAll(
+        'received,preparing,ready,delivered',
+        ['id', 'fullName', 'orderStatus', 'createdAt', 'address']
+      );
       if (response.success) {
         // Transform orders to tracking data
         const tracking = response.data
-          .filter((order: any) => ['received', 'preparing', 'ready', 'delivered'].includes(order.orderStatus))
           .map((order: any) => ({
             orderId: order.id,
             orderNumber: order.id,
@@ -74,7 +74,10 @@ export const Login: React.FC = () => {
           email: data.email || user,
           role: data.role || 'Customer', // Store original role
           phoneNumber: data.phoneNumber || data.phone || '',
-          avatar: data.avatar || ''
+          avatar: data.avatar || '',
+          // JWT session (sent as a bearer token by the API service)
+          accessToken: data.access || '',
+          refreshToken: data.refresh || ''
         };
 
         // Persist new session user
@@ -12,10 +12,77 @@ export const api = axios.create({
   },
 });
 
+// ==================== Session tokens ====================
+// Access/refresh JWTs are stored on the session user object, so clearing
+// rs_current_user on logout also drops them.
+const AUTH_BASE_URL = API_BASE_URL.replace(/\/admin\/?$/, '/auth');
+
+const readSessionUser = (): any => {
+  try {
+    return JSON.parse(sessionStorage.getItem('rs_current_user') || localStorage.getItem('rs_current_user') || 'null');
+  } catch {
+    return null;
+  }
+};
+
+export const saveSessionTokens = (tokens: { access?: string; refresh?: string }) => {
+  const user = readSessionUser();
+  if (!user) return;
+  const updated = {
+    ...user,
+    accessToken: tokens.access ?? user.accessToken,
+    refreshToken: tokens.refresh ?? user.refreshToken,
+  };
+  const serialized = JSON.stringify(updated);
+  sessionStorage.setItem('rs_current_user', serialized);
+  localStorage.setItem('rs_current_user', serialized);
+};
+
+api.interceptors.request.use((config) => {
+  const token = readSessionUser()?.accessToken;
+  if (token && !config.headers.Authorization) {
+    config.headers.Authorization = `Bearer ${token}`;
+  }
+  return config;
+});
+
+// The session is over (logged out, revoked or expired): sign in again
+const endSession = () => {
+  try {
+    sessionStorage.removeItem('rs_current_user');
+    localStorage.removeItem('rs_current_user');
+  } catch {}
+  if (window.location.pathname !== '/login') window.location.href = '/login';
+};
+
+// On an expired access token, refresh once and retry. If that fails the
+// session ends; the request is never retried without a token, because
+// the server refuses tokenless writes for users who were issued tokens.
+api.interceptors.response.use(undefined, async (error: any) => {
+  const original = error.config;
+  if (error.response?.status !== 401 || error.response?.data?.code !== 'token_not_valid' || !original || original._retried) {
+    return Promise.reject(error);
+  }
+  original._retried = true;
+  const refresh = readSessionUser()?.refreshToken;
+  try {
+    if (!refresh) throw new Error('No refresh token');
+    const { data } = await axios.post(`${AUTH_BASE_URL}/token/refresh/`, { refresh });
+    saveSessionTokens({ access: data.access });
+    original.headers.Authorization = `Bearer ${data.access}`;
+  } catch {
+    endSession();
+    return Promise.reject(error);
+  }
+  return api(original);
+});
+
 // ==================== Dashboard API ====================
 export const dashboardApi = {
-  getStats: async () => {
-    const response = await api.get('/dashboard/stats');
+  getStats: async (fields?: string[]) => {
+    const response = await api.get('/dashboard/stats', {
+      params: fields ? { fields: fields.join(',') } : undefined,
+    });
     return response.data;
   },
   getCharts: async () => {
@@ -27,7 +94,8 @@ export const dashboardApi = {
 // ==================== Users API ====================
 export const usersApi = {
   getAll: async (role?: string) => {
-    const response = await api.get('/users', { params: { role } });
+    // Avatars are excluded from the user list unless requested
+    const response = await api.get('/users', { params: { role, include: 'avatar' } });
     return response.data;
   },
   getById: async (userId: string) => {
@@ -112,8 +180,10 @@ export const menuApi = {
 
 // ==================== Orders API ====================
 export const ordersApi = {
-  getAll: async (status?: string) => {
-    const response = await api.get('/orders', { params: { status } });
+  getAll: async (status?: string, fields?: string[]) => {
+    const response = await api.get('/orders', {
+      params: { status, fields: fields ? fields.join(',') : undefined },
+    });
     return response.data;
   },
   getById: async (orderId: string) => {
@@ -124,6 +194,14 @@ export const ordersApi = {
     const response = await api.put(`/orders/${orderId}/status`, { status });
     return response.data;
   },
+  // Server-sent order change events; the caller must close() the source
+  subscribe: (onEvent: (event: MessageEvent) => void) => {
+    const source = new EventSource(`${API_BASE_URL}/events/orders`);
+    ['order.created', 'order.updated', 'order.status', 'reset'].forEach((type) =>
+      source.addEventListener(type, onEvent)
+    );
+    return source;
+  },
   update: async (orderId: string, orderData: any) => {
     const response = await api.put(`/orders/${orderId}`, orderData);
     return response.data;
@@ -197,6 +275,8 @@ export const profileApi = {
   changePassword: async (passwordData: { current_password: string; new_password: string }) => {
     const user = JSON.parse(sessionStorage.getItem('rs_current_user') || '{}');
     const response = await api.put('/profile/password', { ...passwordData, userId: user.id, userEmail: user.email });
+    // Other sessions are signed out; continue with the new token pair
+    if (response.data?.access) saveSessionTokens(response.data);
     return response.data;
   },
 };
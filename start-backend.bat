@@ -25,6 +25,7 @@ echo.
 echo ========================================
 echo.
 
-python manage.py runserver
+REM ASGI server so the SSE event streams (/api/admin/events/*) are served
+python -m uvicorn core.asgi:application --host 127.0.0.1 --port 8000 --reload
 
 pause